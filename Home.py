@@ -1,4 +1,8 @@
 import streamlit as st
+from eternals.preload import preload_masters
+
+# Load the master workbooks in the background while the home page is shown
+preload_masters()
 
 st.title("Welcome to ETERNALS")
 
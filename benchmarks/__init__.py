@@ -0,0 +1 @@
+"""Benchmarks and synthetic input generators for the ETERNALS pages."""
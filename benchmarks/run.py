@@ -0,0 +1,199 @@
+"""Stage-by-stage benchmark of the ETERNALS pages on synthetic inputs.
+
+    python -m benchmarks.run --options 2000 --result-lines 200000 --survey-rows 50000 --out bench.json
+
+Generates option-entry PDFs, a master workbook, a tsexport result book and a
+thesis survey workbook, times each stage separately and writes machine-readable
+JSON (stage timings plus a ranking of the hot paths) so runs can be compared
+across releases.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks import synthetic
+
+
+def _timed(fn, repeat):
+    """Run fn repeat times; returns (last result, [seconds per run])."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_inputs(workdir, args):
+    """Write every synthetic input into workdir; returns the paths and sizes."""
+    master = synthetic.master_frame(n_colleges=args.colleges, seed=args.seed)
+    master_path = os.path.join(workdir, "master.xlsx")
+    master.to_excel(master_path, index=False)
+
+    option_path = os.path.join(workdir, "options.pdf")
+    synthetic.write_option_pdf(option_path, synthetic.option_rows(master, args.options, seed=args.seed))
+
+    result_book_path = os.path.join(workdir, "result_book.pdf")
+    synthetic.write_result_book_pdf(result_book_path, args.result_book_pdf_lines, seed=args.seed)
+
+    survey = synthetic.survey_frame(args.survey_rows, seed=args.seed)
+    survey_path = os.path.join(workdir, "survey.xlsx")
+    survey.to_excel(survey_path, index=False)
+    return {"master": master_path, "options": option_path, "result_book": result_book_path, "survey": survey_path}
+
+
+def run(args):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    from io import BytesIO
+
+    from eternals import figures, master_data
+    from eternals.figures import distribution_chart
+    from eternals.styling import column_styles
+    from eternals.tsexport import extract_student_details, iter_student_records
+    from eternals.verification import MasterMatch, build_order_ranges, extract_option_rows, prepare_upload
+    from eternals.word_report import create_word_doc
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="eternals-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    master_data.SNAPSHOT_DIR = os.path.join(workdir, "snapshots")
+    paths = prepare_inputs(workdir, args)
+    stages = []
+
+    def stage(name, fn, items=None):
+        result, timings = _timed(fn, args.repeat)
+        n = items(result) if callable(items) else items
+        best = min(timings)
+        stages.append({
+            "stage": name,
+            "seconds": round(best, 6),
+            "median_seconds": round(statistics.median(timings), 6),
+            "runs": len(timings),
+            "items": n,
+            "items_per_second": round(n / best, 1) if n and best else None,
+        })
+        return result
+
+    with open(paths["options"], "rb") as f:
+        option_bytes = f.read()
+    with open(paths["result_book"], "rb") as f:
+        result_book_bytes = f.read()
+
+    # Verification pages
+    pdf_data = stage("pdf_extraction.serial", lambda: extract_option_rows(option_bytes, workers=1), items=len)
+    stage("pdf_extraction.pool", lambda: extract_option_rows(option_bytes, workers=args.workers), items=len)
+    # pdfplumber's table finder on every page, as before the fixed-layout template path
+    table_finder = stage("pdf_extraction.table_finder.serial",
+                         lambda: extract_option_rows(option_bytes, workers=1, layout=False), items=len)
+    stage("pdf_extraction.table_finder.pool",
+          lambda: extract_option_rows(option_bytes, workers=args.workers, layout=False), items=len)
+    if not table_finder.equals(pdf_data):
+        raise RuntimeError("Template and table-finder extraction disagree on the synthetic option PDF")
+    stage("master_load.xlsx", lambda: master_data.read_workbook(paths["master"]), items=len)
+    master_data.ensure_snapshot(paths["master"])
+    master = stage("master_load.snapshot", lambda: master_data.load_master(paths["master"]), items=len)
+    index = master_data.load_master_index(paths["master"])
+    upload = prepare_upload(pdf_data)
+    match = stage("merge", lambda: MasterMatch(upload, master, index), items=len(upload))
+    stage("grouping.order_ranges", lambda: build_order_ranges(match.merged, ["Course Name", "Course Type", "Type"]),
+          items=len(upload))
+
+    def style_merged():
+        styles = {col: column_styles(match.merged[col], cmap) for col, cmap in
+                  [("CRS_pdf", plt.cm.tab20), ("Course Type", plt.cm.Pastel1)]}
+        return match.merged.style.apply(lambda column: styles[column.name], axis=0, subset=list(styles)).to_html()
+    stage("styling.merged", style_merged, items=len(match.merged))
+
+    # tsexport
+    lines = list(synthetic.result_book_lines(args.result_lines, seed=args.seed))
+    stage("tsexport.parse_lines", lambda: sum(1 for _ in iter_student_records(lines)), items=len(lines))
+    stage("tsexport.pdf", lambda: extract_student_details(result_book_bytes)[0], items=len)
+
+    # Thesis page
+    survey = stage("thesis.read_excel", lambda: pd.read_excel(paths["survey"]), items=len)
+
+    distributions = []
+    for column in survey.columns:
+        distribution = survey[column].value_counts().head(30).reset_index()
+        distribution.columns = [column, "Count"]
+        distributions.append((column, distribution))
+
+    def render_charts():
+        return [{"title": f"{column} Distribution",
+                 "image": distribution_chart(distribution, column, f"{column} Distribution", column, "Count", "Values")}
+                for column, distribution in distributions]
+
+    def charts():
+        # Each run starts from an empty figure cache, as the first render of an upload does
+        with figures._cache_lock:
+            figures._cache.clear()
+        return render_charts()
+    chart_images = stage("thesis.chart_rendering", charts, items=len(distributions))
+    # Every chart is now cached, as on a page rerun
+    stage("thesis.chart_rendering.memoized", render_charts, items=len(distributions))
+
+    def word_export():
+        tables = [{"title": column, "dataframe": survey[column].value_counts().reset_index()} for column in survey.columns]
+        doc = create_word_doc([{"title": "Distribution Tables", "tables": tables, "charts": chart_images}])
+        buffer = BytesIO()
+        doc.save(buffer)
+        return buffer
+    stage("thesis.word_export", word_export, items=len(survey.columns))
+
+    ranking = [entry["stage"] for entry in sorted(stages, key=lambda entry: entry["seconds"], reverse=True)]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "parameters": {key: value for key, value in vars(args).items() if key not in ("out", "workdir")},
+        },
+        "stages": stages,
+        "ranking": ranking,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--options", type=int, default=1000, help="Rows in the synthetic option-entry PDF")
+    parser.add_argument("--colleges", type=int, default=60, help="Colleges in the synthetic master sheet")
+    parser.add_argument("--result-lines", type=int, default=200_000, help="Lines fed to the tsexport line parser")
+    parser.add_argument("--result-book-pdf-lines", type=int, default=5_000, help="Lines in the tsexport result book PDF")
+    parser.add_argument("--survey-rows", type=int, default=20_000, help="Rows in the thesis survey workbook")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Process pool size for PDF extraction")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Keep the generated inputs here instead of a temporary directory")
+    parser.add_argument("--out", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Synthetic inputs shaped like the real counselling documents."""
+import random
+
+FIRST_NAMES = ["RAMESH", "SRAVANI", "MOHAMMED", "LAKSHMI", "VENKATA", "PRIYA", "SAI", "ANUSHA", "KIRAN", "DIVYA"]
+LAST_NAMES = ["REDDY", "KUMAR", "GOUD", "RAO", "NAIK", "BEGUM", "SHARMA", "YADAV"]
+CATEGORIES = ["OC", "BCA", "BCB", "BCC", "BCD", "BCE", "SC", "ST"]
+
+
+def result_book_lines(n_lines, seed=0, students_per_course=40, courses_per_college=6):
+    """Yield tsexport-style COLL ::/CRS :: result book lines, n_lines in total."""
+    rng = random.Random(seed)
+    emitted = 0
+    rank = 0
+    college = 0
+    while emitted < n_lines:
+        college += 1
+        yield f"COLL :: C{college:04d} - GOVERNMENT COLLEGE OF NURSING {college}, HYDERABAD"
+        emitted += 1
+        for course in range(courses_per_college):
+            if emitted >= n_lines:
+                return
+            yield f"CRS :: BSN{course} - B.SC NURSING SEAT TYPE {course}"
+            yield "-" * 60
+            emitted += 2
+            for _ in range(students_per_course):
+                if emitted >= n_lines:
+                    return
+                rank += rng.randint(1, 5)
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                fields = [str(rank % 1_000_000), f"24{rng.randrange(10**9):09d}", f"{rng.uniform(40, 100):.7f}",
+                          name, "OU", rng.choice(CATEGORIES), rng.choice("FM")]
+                if rng.random() < 0.05:
+                    fields.append("MSM")
+                if rng.random() < 0.03:
+                    fields.append("PHO")
+                if rng.random() < 0.9:
+                    fields.append(f"{rng.choice(['NS', 'S'])}-{rng.choice(CATEGORIES)}-GEN-P{rng.randint(1, 4)}")
+                yield " ".join(fields)
+                emitted += 1
+
+
+OPTION_HEADER = ["OPTNO", "COLL", "COLLEGE NAME", "PLACE", "DIST", "CRS", "FEE"]
+# Relative column widths of the option-entry template
+OPTION_WIDTHS = [0.07, 0.08, 0.38, 0.14, 0.13, 0.08, 0.12]
+PLACES = ["HYDERABAD", "WARANGAL", "KARIMNAGAR", "KHAMMAM", "NIZAMABAD", "MAHABUBNAGAR", "NALGONDA", "SANGAREDDY"]
+COURSES = [("ANES", "MD ANESTHESIA", "Clinical"), ("BIO", "MD BIO CHEMISTRY", "Non Clinical"),
+           ("GM", "MD GENERAL MEDICINE", "Clinical"), ("MICRO", "MD MICRO.BIOLOGY", "Para Clinical"),
+           ("PATH", "MD PATHOLOGY", "Para Clinical"), ("PAED", "MD PAEDIATRICS", "Clinical"),
+           ("RADIO", "MD RADIO DIAGNOSIS", "Clinical"), ("ANATO", "MD ANATOMY", "Non Clinical"),
+           ("OBG", "MS OBSTETRICS & GYNAECOLOGY", "Clinical"), ("ORTHO", "MS ORTHOPAEDICS", "Clinical")]
+FEE_TYPES = ["GOVT", "PVT-A", "PVT-B", "MINORITY"]
+
+
+def master_frame(n_colleges=60, seed=0):
+    """Master choice sheet with one row per (college, course) and per-category closing ranks."""
+    from eternals.master_data import RANK_COLUMNS
+
+    import pandas as pd
+
+    rng = random.Random(seed)
+    rows = []
+    for college in range(n_colleges):
+        coll = f"C{college:03d}"
+        college_name = f"INSTITUTE OF MEDICAL SCIENCES {college}, {rng.choice(PLACES)}"
+        college_type = rng.choice(FEE_TYPES)
+        for crs, course_name, course_type in rng.sample(COURSES, k=rng.randint(4, len(COURSES))):
+            row = {"sno": len(rows) + 1, "COLL": coll, "CRS": crs, "College Name": college_name,
+                   "Type": college_type, "Estd": rng.randint(1950, 2020), "Course Name": course_name,
+                   "Fee": rng.choice([60000, 775000, 1200000, 2500000]), "Course Type": course_type}
+            for column in RANK_COLUMNS:
+                row[column] = rng.randint(100, 60000) if rng.random() < 0.9 else None
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def option_rows(master, n_options, seed=0, missing_rate=0.02):
+    """Option-entry rows drawn from the master, with a few codes that are not in it."""
+    rng = random.Random(seed)
+    records = master[["COLL", "College Name", "CRS", "Type"]].to_records(index=False)
+    rows = []
+    for order in range(1, n_options + 1):
+        coll, college_name, crs, college_type = records[rng.randrange(len(records))]
+        if rng.random() < missing_rate:
+            crs = "XXX"
+        place = college_name.rsplit(", ", 1)[-1]
+        rows.append([str(order), coll, college_name.rsplit(",", 1)[0], place, place, crs, college_type])
+    return rows
+
+
+def write_option_pdf(path, rows, rows_per_page=30):
+    """Write rows as a ruled seven-column option-entry table, with the header repeated on every page."""
+    import matplotlib
+    matplotlib.use("Agg")
+    matplotlib.rcParams["pdf.fonttype"] = 42  # Embed TrueType so the text is extractable
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.lines import Line2D
+
+    edges = [0.03]
+    for width in OPTION_WIDTHS:
+        edges.append(edges[-1] + width * 0.94)
+    with PdfPages(path) as pdf:
+        for first in range(0, max(len(rows), 1), rows_per_page):
+            page_rows = [OPTION_HEADER] + rows[first:first + rows_per_page]
+            fig = plt.figure(figsize=(11.69, 8.27))
+            row_height = 0.9 / (rows_per_page + 1)
+            top = 0.95
+            for i, row in enumerate(page_rows):
+                y = top - (i + 0.7) * row_height
+                for column, value in enumerate(row):
+                    fig.text(edges[column] + 0.004, y, str(value), fontsize=6,
+                             weight="bold" if i == 0 else "normal")
+            bottom = top - len(page_rows) * row_height
+            for i in range(len(page_rows) + 1):
+                y = top - i * row_height
+                fig.add_artist(Line2D([edges[0], edges[-1]], [y, y], color="black", linewidth=0.5))
+            for x in edges:
+                fig.add_artist(Line2D([x, x], [bottom, top], color="black", linewidth=0.5))
+            pdf.savefig(fig)
+            plt.close(fig)
+
+
+def write_result_book_pdf(path, n_lines, lines_per_page=70, seed=0):
+    """Write a tsexport-style COLL ::/CRS :: result book as a text PDF."""
+    import matplotlib
+    matplotlib.use("Agg")
+    matplotlib.rcParams["pdf.fonttype"] = 42
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    lines = list(result_book_lines(n_lines, seed=seed))
+    with PdfPages(path) as pdf:
+        for first in range(0, max(len(lines), 1), lines_per_page):
+            fig = plt.figure(figsize=(8.27, 11.69))
+            for i, line in enumerate(lines[first:first + lines_per_page]):
+                fig.text(0.03, 0.97 - i * (0.94 / lines_per_page), line, fontsize=5, family="monospace")
+            pdf.savefig(fig)
+            plt.close(fig)
+    return len(lines)
+
+
+def survey_frame(n_rows, n_numeric=20, n_categorical=10, seed=0):
+    """Thesis-style questionnaire: Likert and score columns plus low-cardinality text answers."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_numeric):
+        if i % 2:
+            data[f"Q{i + 1}"] = rng.integers(1, 6, n_rows)  # Likert 1-5
+        else:
+            data[f"Score{i + 1}"] = np.round(rng.normal(60, 15, n_rows), 1)
+    answers = [["Male", "Female"], ["Urban", "Rural", "Semi-urban"], ["Yes", "No", "Not sure"],
+               ["UG", "PG", "PhD", "Diploma"]]
+    for i in range(n_categorical):
+        choices = answers[i % len(answers)]
+        data[f"Group{i + 1}"] = rng.choice(choices, n_rows)
+    return pd.DataFrame(data)
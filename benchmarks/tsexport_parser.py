@@ -0,0 +1,40 @@
+"""Throughput benchmark for the tsexport student-row parser.
+
+    python -m benchmarks.tsexport_parser --lines 1000000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.synthetic import result_book_lines
+from eternals.tsexport_parser import ParseStats
+
+
+def run(n_lines, seed=0):
+    from eternals.tsexport import iter_student_records
+
+    lines = list(result_book_lines(n_lines, seed=seed))
+    stats = ParseStats()
+    start = time.perf_counter()
+    records = sum(1 for _ in iter_student_records(lines, stats))
+    elapsed = time.perf_counter() - start
+    return {
+        "benchmark": "tsexport_parser",
+        "lines": len(lines),
+        "records": records,
+        "rejected": dict(stats.rejected),
+        "seconds": round(elapsed, 4),
+        "lines_per_second": round(len(lines) / elapsed) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.lines, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
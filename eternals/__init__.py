@@ -0,0 +1 @@
+"""Shared engines used by the ETERNALS Streamlit pages."""
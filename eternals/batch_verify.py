@@ -0,0 +1,296 @@
+"""Headless batch verification of student option PDFs against a master sheet.
+
+    python -m eternals.batch_verify OPTION_PDF_DIR --profile tsa-r2 --out reports/tsa-r2
+    python -m eternals.batch_verify OPTION_PDF_DIR --master tsbr1orderpg.xlsx --group-by "Course Name,Course Type,Fee Type"
+    python -m eternals.batch_verify OPTION_PDF_DIR --profile tsa-r2 --students students.csv
+    python -m eternals.batch_verify OPTION_PDF_DIR --profile tsa-r2 --previous reports/bcat-r1 --format parquet
+
+Runs the same steps as the TS verification pages (extract_pdf_data -> MAIN
+CODE match -> order ranges -> validation) for every PDF in a directory. The
+master is loaded once per worker process, files are verified concurrently,
+and one consolidated report is written: per-file validation counts plus the
+merged, order-range and missing-in-master detail. With a students CSV
+(File, Rank, Category, Gender) every listed option is also checked against
+the master's closing ranks, for all files in one pass.
+
+Every report keeps a copy of the master it was verified against and the
+content hash of each PDF. Given a previous report, only the files whose
+options touch a MAIN CODE added, removed or changed since that master (or
+whose PDF changed) are verified again; the rest are carried over, with the
+master's columns of their merged rows (serial numbers move when options are
+inserted) refreshed from the new master.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from eternals.feasibility import flag_options, load_feasibility_index
+from eternals.master_data import KEY_COLUMN, PROFILES, ensure_snapshot, load_master, load_master_index
+from eternals.master_delta import MasterDelta
+from eternals.pdf_cache import content_hash, file_bytes
+from eternals.verification import MasterMatch, build_order_ranges, extract_option_data, prepare_upload, validation_counts
+
+DETAIL_TABLES = ["merged", "order_ranges", "missing_in_master"]
+STUDENT_COLUMNS = ["File", "Rank", "Category", "Gender"]
+FEASIBILITY_COUNTS = ["out_of_reach", "no_closing_rank", "dominated"]
+# Copy of the master a report was verified against, read back for incremental runs
+REPORT_MASTER = "master.parquet"
+
+_worker_state = {}
+
+
+def _init_worker(master_file):
+    """Load the master snapshot and its index once per worker process."""
+    _worker_state["master"] = load_master(master_file)
+    _worker_state["index"] = load_master_index(master_file)
+
+
+def verify_pdf(path, group_columns, master_sheet=None, master_index=None):
+    """Verify one option PDF; returns (summary dict, {table name: DataFrame})."""
+    master_sheet = master_sheet if master_sheet is not None else _worker_state["master"]
+    master_index = master_index if master_index is not None else _worker_state["index"]
+    summary = {"file": os.path.basename(path)}
+    start = time.perf_counter()
+    try:
+        pdf_bytes = file_bytes(path)
+        summary["sha256"] = content_hash(pdf_bytes)
+        # Files are already spread across processes, so each PDF is parsed in-process
+        pdf_data = extract_option_data(pdf_bytes, workers=1)
+        if pdf_data is None or pdf_data.empty:
+            summary["error"] = "No valid data found in the PDF"
+            return summary, {}
+        match = MasterMatch(prepare_upload(pdf_data), master_sheet, master_index)
+        summary.update(validation_counts(match))
+        details = {"merged": match.merged, "missing_in_master": match.missing_in_master}
+        if all(col in match.merged.columns for col in group_columns):
+            details["order_ranges"] = build_order_ranges(match.merged, group_columns)
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+        details = {}
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary, details
+
+
+def list_pdfs(pdf_dir):
+    """PDF files in a directory, sorted by name."""
+    return sorted(os.path.join(pdf_dir, name) for name in os.listdir(pdf_dir) if name.lower().endswith(".pdf"))
+
+
+def run_batch(pdf_paths, master_file, group_columns, workers=None, log=None):
+    """Verify every PDF; returns (summary DataFrame, {table name: DataFrame}) ordered by file name."""
+    log = log or (lambda message: print(message, file=sys.stderr))
+    # Build the snapshot once up front so workers never race to rebuild it
+    ensure_snapshot(master_file)
+    workers = workers or os.cpu_count() or 1
+    results = {}
+    start = time.perf_counter()
+
+    def record(path, result):
+        results[path] = result
+        summary = result[0]
+        elapsed = time.perf_counter() - start
+        status = summary.get("error") or f"{summary['options']} options, {summary['missing_in_master']} missing in master"
+        log(f"[{len(results)}/{len(pdf_paths)}] {summary['file']}: {status} ({len(results) / elapsed:.1f} files/s)")
+
+    if workers == 1:
+        master_sheet, master_index = load_master(master_file), load_master_index(master_file)
+        for path in pdf_paths:
+            record(path, verify_pdf(path, group_columns, master_sheet, master_index))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(master_file,)) as pool:
+            futures = {pool.submit(verify_pdf, path, group_columns): path for path in pdf_paths}
+            for future in as_completed(futures):
+                record(futures[future], future.result())
+
+    elapsed = time.perf_counter() - start
+    summaries = []
+    tables = {name: [] for name in DETAIL_TABLES}
+    for path in pdf_paths:
+        summary, details = results[path]
+        summaries.append(summary)
+        for name, frame in details.items():
+            tables[name].append(frame.assign(File=summary["file"]))
+    summary_frame = pd.DataFrame(summaries)
+    n_options = int(summary_frame["options"].sum()) if "options" in summary_frame else 0
+    log(f"Verified {len(pdf_paths)} files ({n_options} options) in {elapsed:.1f}s: "
+        f"{len(pdf_paths) / elapsed:.2f} files/s, {n_options / elapsed:.0f} options/s")
+    detail_frames = {name: pd.concat(frames, ignore_index=True) for name, frames in tables.items() if frames}
+    return summary_frame, detail_frames
+
+
+def stale_files(previous_summary, previous_details, pdf_paths, delta):
+    """Names of the files in pdf_paths that an incremental run has to verify again."""
+    names = {os.path.basename(path): path for path in pdf_paths}
+    if delta.schema_changed:
+        # Every merged row carries the master's columns, so a new layout touches every file
+        return set(names)
+    hashes = {name: content_hash(file_bytes(path)) for name, path in names.items()}
+    previous = previous_summary.set_index("file")
+    stale = {name for name in names if name not in previous.index or previous.at[name, "sha256"] != hashes[name]}
+    if "error" in previous:
+        stale |= set(previous.index[previous["error"].notna()]) & set(names)
+    # One isin over every previous option finds the files that list a changed MAIN CODE
+    merged = previous_details.get("merged")
+    if merged is not None and len(delta.changed_keys):
+        touched = merged["File"][merged[KEY_COLUMN].astype(str).isin(delta.changed_keys.astype(str))]
+        stale |= set(touched.unique()) & set(names)
+    return stale
+
+
+def refresh_master_columns(merged, master_sheet, master_index, suffix="_master"):
+    """merged with every master-sourced column re-read from master_sheet by MAIN CODE."""
+    positions = master_index.lookup(merged[KEY_COLUMN])
+    master_rows = master_sheet.drop(columns=[KEY_COLUMN]).reset_index(drop=True).reindex(positions)
+    merged = merged.copy()
+    for col in master_rows.columns:
+        # Columns the upload also has were joined with a suffix, as in MasterMatch
+        target = f"{col}{suffix}" if f"{col}{suffix}" in merged.columns else col
+        if target in merged.columns:
+            merged[target] = master_rows[col].to_numpy()
+    return merged
+
+
+def run_incremental(pdf_paths, master_file, group_columns, previous, workers=None, log=None):
+    """run_batch() for only the files a master change or PDF change touched; the rest come from previous.
+
+    previous is (summary, details, master sheet) as returned by load_report.
+    Returns (summary, details, delta), ordered by file name like run_batch.
+    """
+    log = log or (lambda message: print(message, file=sys.stderr))
+    previous_summary, previous_details, previous_master = previous
+    master_sheet = load_master(master_file)
+    delta = MasterDelta(previous_master, master_sheet)
+    counts = delta.summary()
+    log(f"Master delta: {counts['added']} added, {counts['removed']} removed, {counts['changed']} changed options")
+
+    stale = stale_files(previous_summary, previous_details, pdf_paths, delta)
+    log(f"Re-verifying {len(stale)} of {len(pdf_paths)} files")
+    stale_paths = [path for path in pdf_paths if os.path.basename(path) in stale]
+    summary, details = run_batch(stale_paths, master_file, group_columns, workers, log) if stale_paths else (pd.DataFrame(), {})
+
+    kept = [os.path.basename(path) for path in pdf_paths if os.path.basename(path) not in stale]
+    kept_summary = previous_summary[previous_summary["file"].isin(kept)].copy()
+    if "missing_in_upload" in kept_summary:
+        # Kept files list none of the added or removed options, so only the master's size moved
+        kept_summary["missing_in_upload"] += len(delta.added) - len(delta.removed)
+    summary = pd.concat([kept_summary, summary], ignore_index=True)
+    order = {os.path.basename(path): i for i, path in enumerate(pdf_paths)}
+    summary = summary.sort_values("file", key=lambda files: files.map(order)).reset_index(drop=True)
+    for name, frame in previous_details.items():
+        if name not in DETAIL_TABLES:
+            continue
+        frame = frame[frame["File"].isin(kept)]
+        if name == "merged":
+            # Kept options are unchanged in content, but position columns such as sno follow the new master
+            frame = refresh_master_columns(frame, master_sheet, load_master_index(master_file))
+        frames = [frame] + ([details[name]] if name in details else [])
+        details[name] = pd.concat(frames, ignore_index=True)
+        details[name] = details[name].sort_values("File", key=lambda files: files.map(order), kind="stable").reset_index(drop=True)
+    return summary, details, delta
+
+
+def add_feasibility(summary, details, students, master_file):
+    """Flag every merged option against the closing ranks; adds a feasibility table and per-file counts."""
+    missing = [col for col in STUDENT_COLUMNS if col not in students.columns]
+    if missing:
+        raise ValueError(f"Students file is missing columns: {', '.join(missing)}")
+    if "merged" not in details:
+        return summary, details
+    students = students[STUDENT_COLUMNS].drop_duplicates("File")
+    options = details["merged"].merge(students, on="File", how="inner")
+    flagged = flag_options(load_feasibility_index(master_file), options, group_column="File")
+    counts = flagged.groupby("File")[["Out of Reach", "No Closing Rank", "Dominated"]].sum()
+    counts.columns = FEASIBILITY_COUNTS
+    summary = summary.merge(counts.astype("Int64"), left_on="file", right_index=True, how="left")
+    return summary, {**details, "feasibility": flagged}
+
+
+def write_report(summary, details, out_dir, detail_format="excel", master_sheet=None):
+    """Write the consolidated report into out_dir and return the written paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    if master_sheet is not None:
+        master_sheet.to_parquet(os.path.join(out_dir, REPORT_MASTER), index=False)
+    if detail_format == "parquet":
+        paths = [os.path.join(out_dir, "summary.parquet")]
+        summary.to_parquet(paths[0], index=False)
+        for name, frame in details.items():
+            path = os.path.join(out_dir, f"{name}.parquet")
+            # Text columns can mix strings and blanks across files; store them as strings
+            frame.astype({col: "string" for col in frame.columns if frame[col].dtype == object}).to_parquet(path, index=False)
+            paths.append(path)
+        return paths
+    path = os.path.join(out_dir, "report.xlsx")
+    with pd.ExcelWriter(path) as writer:
+        summary.to_excel(writer, sheet_name="Summary", index=False)
+        for name, frame in details.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
+    return [path]
+
+
+def load_report(out_dir):
+    """(summary, details, master sheet) of a report written by write_report in either format."""
+    master_path = os.path.join(out_dir, REPORT_MASTER)
+    if not os.path.exists(master_path):
+        raise FileNotFoundError(f"{out_dir} has no {REPORT_MASTER}; re-run the full batch once to record its master")
+    master_sheet = pd.read_parquet(master_path)
+    if os.path.exists(os.path.join(out_dir, "summary.parquet")):
+        summary = pd.read_parquet(os.path.join(out_dir, "summary.parquet"))
+        details = {name: pd.read_parquet(os.path.join(out_dir, f"{name}.parquet")) for name in DETAIL_TABLES
+                   if os.path.exists(os.path.join(out_dir, f"{name}.parquet"))}
+    else:
+        sheets = pd.read_excel(os.path.join(out_dir, "report.xlsx"), sheet_name=None, dtype={KEY_COLUMN: str})
+        summary = sheets.pop("Summary")
+        details = {name: frame for name, frame in sheets.items() if name in DETAIL_TABLES}
+    if "sha256" not in summary:
+        summary["sha256"] = None
+    # Feasibility counts belong to the old master's closing ranks and are recomputed with --students
+    return summary.drop(columns=FEASIBILITY_COUNTS, errors="ignore"), details, master_sheet
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf_dir", help="Directory of student option-entry PDFs")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="tsa-r2",
+                        help="Verification page to mirror (master file and order-range grouping)")
+    parser.add_argument("--master", help="Master workbook, overriding the profile's")
+    parser.add_argument("--group-by", help="Comma-separated order-range grouping columns, overriding the profile's")
+    parser.add_argument("--out", default="batch_report", help="Output directory for the report")
+    parser.add_argument("--format", choices=["excel", "parquet"], default="excel", help="Report format")
+    parser.add_argument("--students", help="CSV of File, Rank, Category, Gender to check options against closing ranks")
+    parser.add_argument("--previous", help="Earlier report directory; only files touched by master or PDF changes are re-verified")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    master_file, group_columns = PROFILES[args.profile]
+    master_file = args.master or master_file
+    if args.group_by:
+        group_columns = [col.strip() for col in args.group_by.split(",")]
+
+    pdf_paths = list_pdfs(args.pdf_dir)
+    if not pdf_paths:
+        parser.error(f"No PDF files found in {args.pdf_dir}")
+    if args.students:
+        # Check the master has closing ranks before verifying any file
+        try:
+            load_feasibility_index(master_file)
+        except ValueError as e:
+            parser.error(f"--students needs a master with closing ranks: {e}")
+    if args.previous:
+        summary, details, _ = run_incremental(pdf_paths, master_file, group_columns, load_report(args.previous), args.workers or None)
+    else:
+        summary, details = run_batch(pdf_paths, master_file, group_columns, args.workers or None)
+    if args.students:
+        summary, details = add_feasibility(summary, details, pd.read_csv(args.students), master_file)
+    for path in write_report(summary, details, args.out, args.format, load_master(master_file)):
+        print(path)
+    return 1 if "error" in summary and summary["error"].notna().any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Binning of numeric columns into manual ('<5', '5-10', '>90') or fixed-step ranges.
+
+A range spec is parsed and validated once into sorted interval edges, and
+values are assigned with a vectorized sorted-edge search.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+OTHER_LABEL = "Other"
+
+_NUMBER = r"-?\d+(?:\.\d+)?"
+_BETWEEN = re.compile(rf"^({_NUMBER})\s*-\s*({_NUMBER})$")
+_BOUND = re.compile(rf"^([<>])\s*({_NUMBER})$")
+
+
+class RangeSpec:
+    """Sorted, non-overlapping intervals with a label each.
+
+    Intervals are [low, high) except '>t', which is (t, inf).
+    """
+
+    def __init__(self, labels, lows, highs, low_open):
+        order = np.argsort(lows, kind="stable")
+        self.labels = [labels[i] for i in order]
+        self.lows = np.asarray(lows, dtype=float)[order]
+        self.highs = np.asarray(highs, dtype=float)[order]
+        self.low_open = np.asarray(low_open, dtype=bool)[order]
+        self.key = tuple(zip(self.labels, self.lows.tolist(), self.highs.tolist(), self.low_open.tolist()))
+        for i in range(len(self.labels) - 1):
+            if self.highs[i] > self.lows[i + 1]:
+                raise ValueError(f"Ranges '{self.labels[i]}' and '{self.labels[i + 1]}' overlap")
+
+    @classmethod
+    def parse(cls, lines):
+        """Parse manual range lines such as '<5', '5-10' and '>90'; blank lines are ignored."""
+        labels, lows, highs, low_open = [], [], [], []
+        for line in lines:
+            text = line.strip()
+            if not text:
+                continue
+            bound = _BOUND.match(text)
+            between = _BETWEEN.match(text)
+            if bound:
+                threshold = float(bound.group(2))
+                if bound.group(1) == "<":
+                    low, high, is_open = -np.inf, threshold, False
+                else:
+                    low, high, is_open = threshold, np.inf, True
+            elif between:
+                low, high, is_open = float(between.group(1)), float(between.group(2)), False
+                if low >= high:
+                    raise ValueError(f"Range '{text}' must go from low to high")
+            else:
+                raise ValueError(f"Cannot read range '{text}'; use forms like '<5', '5-10' or '>90'")
+            labels.append(text)
+            lows.append(low)
+            highs.append(high)
+            low_open.append(is_open)
+        if not labels:
+            raise ValueError("No ranges given")
+        return cls(labels, lows, highs, low_open)
+
+    @classmethod
+    def from_step(cls, minimum, maximum, step):
+        """Contiguous [edge, edge + step) ranges covering minimum..maximum."""
+        if step <= 0:
+            raise ValueError("Step size must be positive")
+        # Plain Python numbers, so downcast (e.g. int8) bounds cannot overflow
+        minimum, maximum = np.asarray([minimum, maximum]).tolist()
+        edges = np.arange(minimum, maximum + step, step)
+        labels = [f"{round(edges[i], 2)}-{round(edges[i + 1], 2)}" for i in range(len(edges) - 1)]
+        return cls(labels, edges[:-1], edges[1:], [False] * len(labels))
+
+    def codes(self, values):
+        """Index of the interval holding each value, -1 for values outside every interval (or missing)."""
+        values = np.asarray(values, dtype=float)
+        candidate = np.searchsorted(self.lows, values, side="right") - 1
+        safe = np.clip(candidate, 0, None)
+        inside = (
+            (candidate >= 0)
+            & (values < self.highs[safe])
+            & ~(self.low_open[safe] & (values == self.lows[safe]))
+        )
+        return np.where(inside, candidate, -1)
+
+    def assign(self, values, other_label=OTHER_LABEL):
+        """Categorical of range labels in range order; values outside every range get other_label (None drops them)."""
+        codes = self.codes(values)
+        categories = list(self.labels)
+        if other_label is not None and (codes < 0).any():
+            codes = np.where(codes < 0, len(categories), codes)
+            categories.append(other_label)
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def binned_column(series, spec, other_label=OTHER_LABEL):
+    """Series of spec's labels for series, aligned with its index."""
+    return pd.Series(spec.assign(pd.to_numeric(series, errors="coerce"), other_label), index=series.index, name=series.name)
@@ -0,0 +1,71 @@
+"""Camelot 'stream' table extraction without a shared temp file.
+
+Camelot only reads from a path, so every call writes the PDF bytes to its own
+temporary file and removes it afterwards; concurrent sessions never share a
+file. Long documents are split into page chunks that are parsed in the
+shared worker pool, and results are cached by content hash and page range.
+"""
+import os
+import re
+import tempfile
+
+from eternals.pdf_cache import cached_extraction
+from eternals.pdf_extract import MIN_PAGES_FOR_POOL, WORKERS, map_page_chunks, page_count, split_page_range
+
+_PAGE_RANGE = re.compile(r"^(\d+)(?:\s*-\s*(\d+|end))?$")
+
+
+class PageRangeError(ValueError):
+    """A page range that cannot be read or lies outside the document."""
+
+
+def parse_page_range(text, n_pages):
+    """1-based page numbers for text like '1-5, 8, 10-end'; blank or 'all' means every page."""
+    text = (text or "").strip().lower()
+    if text in ("", "all"):
+        return list(range(1, n_pages + 1))
+    pages = []
+    for part in text.split(","):
+        match = _PAGE_RANGE.match(part.strip())
+        if not match:
+            raise PageRangeError(f"Cannot read page range '{part.strip()}'; use forms like '1-5', '8' or '10-end'")
+        first = int(match.group(1))
+        last = first if match.group(2) is None else (n_pages if match.group(2) == "end" else int(match.group(2)))
+        if first < 1 or last > n_pages or first > last:
+            raise PageRangeError(f"Page range '{part.strip()}' is outside pages 1-{n_pages}")
+        pages.extend(range(first, last + 1))
+    # Pages are extracted once each, in document order
+    return sorted(set(pages))
+
+
+def _read_stream_tables(pdf_bytes, pages):
+    """Table DataFrames camelot finds on pages (1-based), read from a private temporary copy of the PDF."""
+    # camelot pulls in OpenCV, so it is imported only when a PDF is actually parsed
+    import camelot
+
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        tables = camelot.read_pdf(path, pages=",".join(map(str, pages)), flavor="stream")
+        return [table.df for table in tables]
+    finally:
+        os.remove(path)
+
+
+def read_stream_tables(pdf_bytes, pages=None, workers=None, min_pages=MIN_PAGES_FOR_POOL):
+    """Camelot stream tables of the given pages (default all), in page order, parsed in parallel for long ranges."""
+    pages = list(pages) if pages is not None else list(range(1, page_count(pdf_bytes) + 1))
+    workers = WORKERS if workers is None else workers
+    if workers <= 1 or len(pages) < max(min_pages, 2):
+        return _read_stream_tables(pdf_bytes, pages)
+    chunks = [(pages[start:stop],) for start, stop in split_page_range(len(pages), workers * 2)]
+    return map_page_chunks(_read_stream_tables, pdf_bytes, chunks, workers)
+
+
+def cached_stream_tables(source, page_range="", workers=None):
+    """read_stream_tables() for an upload's page range, through the shared content-hash cache."""
+    def compute(pdf_bytes):
+        return read_stream_tables(pdf_bytes, parse_page_range(page_range, page_count(pdf_bytes)), workers)
+
+    return cached_extraction(source, "camelot_stream", {"pages": "".join((page_range or "").split()).lower()}, compute)
@@ -0,0 +1,167 @@
+"""Process-wide store of parsed uploads, shared by every session.
+
+An uploaded workbook is parsed once per content hash: numeric columns are
+downcast where no values change and low-cardinality text columns become
+categoricals. Values derived from it (numeric subset, correlation matrix,
+binned columns) are kept alongside as named artifacts. Datasets are evicted
+least-recently-used once their combined size passes the memory budget.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from eternals.pdf_cache import content_hash, file_bytes
+from eternals.statistics import column_moments, correlation_block
+
+MEMORY_BUDGET = int(os.environ.get("ETERNALS_DATASET_MEMORY_MB", "512")) * 1024 * 1024
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+
+def is_text_column(series):
+    """True for object, string and categorical columns."""
+    return isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(series.dtype)
+
+
+def optimize_dtypes(df, category_ratio=CATEGORY_RATIO):
+    """Copy of df with lossless numeric downcasts and categorical low-cardinality text columns."""
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            columns[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            # float32 only when every value survives the round trip
+            narrow = series.astype(np.float32)
+            if narrow.astype(series.dtype).equals(series):
+                columns[column] = narrow
+        elif is_text_column(series) and not isinstance(series.dtype, pd.CategoricalDtype) and len(series):
+            # Mixed-type columns (e.g. numbers and text) stay as objects
+            if series.dropna().map(type).nunique() <= 1 and series.nunique() <= category_ratio * len(series):
+                columns[column] = series.astype("category")
+    return df.assign(**columns) if columns else df.copy()
+
+
+def _nbytes(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum()) if isinstance(value, pd.DataFrame) else int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return sys.getsizeof(value)
+
+
+class Dataset:
+    """A parsed upload and the artifacts derived from it."""
+
+    def __init__(self, key, frame, store=None):
+        self.key = key
+        self.frame = frame
+        self._store = store
+        self._artifacts = {}
+        self._sizes = {"frame": _nbytes(frame)}
+
+    @property
+    def nbytes(self):
+        return sum(self._sizes.values())
+
+    def artifact(self, name, compute):
+        """Value of compute() stored under name, computed on first use."""
+        if name in self._artifacts:
+            return self._artifacts[name]
+        value = compute()
+        self._artifacts[name] = value
+        self._sizes[name] = _nbytes(value)
+        if self._store is not None:
+            self._store.trim()
+        return value
+
+    def numeric(self):
+        """Numeric columns of the frame."""
+        return self.artifact("numeric", lambda: self.frame.select_dtypes(include=[np.number]))
+
+    def moments(self):
+        """Count, mean, median and spread of every numeric column."""
+        return self.artifact("moments", lambda: column_moments(self.numeric()))
+
+    def correlation(self, columns=None):
+        """Pearson correlation matrix of the numeric columns (or of just columns)."""
+        columns = tuple(columns) if columns is not None else tuple(self.numeric().columns)
+        return self.artifact(("correlation", columns), lambda: correlation_block(self.numeric(), self.moments(), columns))
+
+
+class DatasetStore:
+    """LRU of Datasets bounded by their combined size in bytes."""
+
+    def __init__(self, budget=MEMORY_BUDGET):
+        self.budget = budget
+        self._datasets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            dataset = self._datasets.get(key)
+            if dataset is not None:
+                self._datasets.move_to_end(key)
+            return dataset
+
+    def put(self, key, frame):
+        dataset = Dataset(key, frame, self)
+        with self._lock:
+            self._datasets[key] = dataset
+        self.trim()
+        return dataset
+
+    def trim(self):
+        """Evict least recently used datasets until the store fits its budget (the newest is always kept)."""
+        with self._lock:
+            while len(self._datasets) > 1 and sum(d.nbytes for d in self._datasets.values()) > self.budget:
+                self._datasets.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._datasets.clear()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def default_store():
+    """The store shared by every session in this process."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = DatasetStore()
+        return _default_store
+
+
+def load_dataset(uploaded_file, reader=pd.read_excel, session_state=None, store=None):
+    """Dataset for an upload, parsed with reader only the first time its contents are seen.
+
+    When session_state is given the upload's content hash is remembered per
+    file_id, so reruns skip re-hashing the bytes.
+    """
+    store = store or default_store()
+    known = session_state.setdefault("dataset_keys", {}) if session_state is not None else {}
+    file_id = getattr(uploaded_file, "file_id", None)
+    data = None
+    digest = known.get(file_id) if file_id is not None else None
+    if digest is None:
+        data = file_bytes(uploaded_file)
+        digest = content_hash(data)
+        if file_id is not None:
+            known[file_id] = digest
+    key = (digest, getattr(reader, "__name__", repr(reader)))
+    dataset = store.get(key)
+    if dataset is None:
+        data = data if data is not None else file_bytes(uploaded_file)
+        dataset = store.put(key, optimize_dtypes(reader(BytesIO(data))))
+    return dataset
@@ -0,0 +1,35 @@
+"""Frequency tables for the thesis pages.
+
+Multi-column ("combined") distributions are grouped counts over the columns'
+factorized codes, so no Python tuple is built per row.
+"""
+import pandas as pd
+
+
+def combined_frequencies(df, columns):
+    """Count every combination of values in columns, most frequent first, with its percentage."""
+    counts = df.groupby(list(columns), dropna=False, observed=True, sort=False).size()
+    table = counts.reset_index(name="Count").sort_values("Count", ascending=False, kind="stable")
+    table["Percentage"] = (table["Count"] / table["Count"].sum() * 100).round(2)
+    return table.reset_index(drop=True)
+
+
+def marginal_totals(df, columns):
+    """Counts and percentages of each value of each column on its own, as (Column, Value, Count, Percentage) rows."""
+    tables = []
+    for column in columns:
+        counts = df[column].value_counts(dropna=False)
+        tables.append(pd.DataFrame({
+            "Column": column,
+            "Value": counts.index.astype(str),
+            "Count": counts.to_numpy(),
+            "Percentage": (counts / counts.sum() * 100).round(2).to_numpy(),
+        }))
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=["Column", "Value", "Count", "Percentage"])
+
+
+def format_percentages(table, column="Percentage"):
+    """Copy of table with the percentage column rendered as '12.5%' for display and export."""
+    table = table.copy()
+    table[column] = table[column].astype(str) + "%"
+    return table
@@ -0,0 +1,141 @@
+"""Closing-rank feasibility of options for a student's rank, category and gender.
+
+The master's per-category closing ranks are folded into one effective closing
+rank per MAIN CODE for each (category, gender) profile: GEN_ columns for
+gender-neutral seats, and overall_ columns (the larger of GEN_ and FEM_) for
+students also eligible for women's seats. OPEN seats are open to every
+category. A closing rank of 0 means no seat was allotted in that category.
+
+Each profile keeps its closing ranks sorted, so the options within reach of a
+rank are one searchsorted slice, and option lists are flagged for many
+students at once with array lookups instead of a loop per option.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from eternals.master_data import KEY_COLUMN, RANK_COLUMNS, ensure_snapshot, load_master, load_master_index
+
+GENDERS = ["GEN", "FEM"]
+CATEGORIES = [column.split("_", 1)[1] for column in RANK_COLUMNS if column.startswith("overall_")]
+
+_feasibility_cache = {}
+
+
+def profile_columns(category, gender):
+    """Closing-rank columns a student of category and gender can be allotted under."""
+    prefix = "overall" if gender == "FEM" else "GEN"
+    return list(dict.fromkeys([f"{prefix}_OPEN", f"{prefix}_{category}"]))
+
+
+def normalize_gender(gender):
+    """'FEM' for female values ('F', 'Female', 'FEM'), 'GEN' for anything else."""
+    return "FEM" if str(gender).strip().upper() in ("F", "FEM", "FEMALE") else "GEN"
+
+
+class FeasibilityIndex:
+    """Effective closing rank of every master MAIN CODE for each (category, gender) profile."""
+
+    def __init__(self, master_sheet, master_index):
+        missing = [column for column in RANK_COLUMNS if column not in master_sheet.columns]
+        if missing:
+            more = ", ..." if len(missing) > 3 else ""
+            raise ValueError(f"The master is missing {len(missing)} closing-rank columns ({', '.join(missing[:3])}{more})")
+        self.master_index = master_index
+        self.profiles = [(category, gender) for category in CATEGORIES for gender in GENDERS]
+        ranks = master_sheet[RANK_COLUMNS].to_numpy(dtype=np.float64, na_value=np.nan)
+        if len(master_index.positions):
+            ranks = ranks[master_index.positions]
+        ranks[ranks <= 0] = np.nan
+        column_ids = {column: i for i, column in enumerate(RANK_COLUMNS)}
+        # One column per profile; fmax skips NaN, leaving NaN where the option had no seat for it
+        self.closing = np.column_stack([
+            np.fmax.reduce(ranks[:, [column_ids[column] for column in profile_columns(*profile)]], axis=1)
+            for profile in self.profiles
+        ])
+        # Per profile: key ids ordered by closing rank, and the sorted ranks (NaNs last)
+        self.order = np.argsort(self.closing, axis=0, kind="stable")
+        self.sorted = np.take_along_axis(self.closing, self.order, axis=0)
+        self.n_ranked = (~np.isnan(self.closing)).sum(axis=0)
+
+    def profile_ids(self, categories, genders):
+        """Profile number for each (category, gender) pair; raises ValueError for unknown categories."""
+        categories = pd.Series(categories, dtype=object).astype(str).str.strip().str.upper().to_numpy()
+        genders = pd.Series(genders, dtype=object).map(normalize_gender).to_numpy()
+        unknown = sorted(set(categories) - set(CATEGORIES))
+        if unknown:
+            raise ValueError(f"Unknown categories: {', '.join(unknown)} (expected one of {', '.join(CATEGORIES)})")
+        category_ids = pd.Index(CATEGORIES).get_indexer(categories)
+        return category_ids * len(GENDERS) + (genders == "FEM")
+
+    def closing_ranks(self, main_codes, profile_ids):
+        """Closing rank of each MAIN CODE under the matching profile; NaN when unknown or not allotted."""
+        key_ids = self.master_index.key_ids(main_codes)
+        closing = np.full(len(key_ids), np.nan)
+        found = key_ids >= 0
+        closing[found] = self.closing[key_ids[found], np.asarray(profile_ids)[found]]
+        return closing
+
+    def eligible(self, rank, category, gender):
+        """Options whose closing rank is at or beyond rank, most competitive first."""
+        profile = self.profile_ids([category], [gender])[0]
+        ranked = self.sorted[:self.n_ranked[profile], profile]
+        start = np.searchsorted(ranked, rank, side="left")
+        key_ids = self.order[start:self.n_ranked[profile], profile]
+        return pd.DataFrame({
+            KEY_COLUMN: np.asarray(self.master_index.keys)[key_ids],
+            "Closing Rank": ranked[start:].astype(np.int64),
+        })
+
+    def eligible_counts(self, ranks, categories, genders):
+        """Number of options within reach of each student's rank."""
+        ranks = np.asarray(ranks, dtype=np.float64)
+        profiles = self.profile_ids(categories, genders)
+        counts = np.zeros(len(ranks), dtype=np.int64)
+        # One searchsorted per profile present, over all its students at once
+        for profile in np.unique(profiles):
+            rows = profiles == profile
+            ranked = self.sorted[:self.n_ranked[profile], profile]
+            counts[rows] = len(ranked) - np.searchsorted(ranked, ranks[rows], side="left")
+        return counts
+
+
+def flag_options(index, options, group_column=None, order_column="Order",
+                 rank_column="Rank", category_column="Category", gender_column="Gender"):
+    """options with Closing Rank, Rank Margin, No Closing Rank, Out of Reach and Dominated columns added.
+
+    options has one row per listed option (MAIN CODE, order) with the
+    student's rank, category and gender; group_column separates students in a
+    batch. An option is dominated when an earlier option in the same list is
+    within reach, since the student would be allotted that one first.
+    """
+    profiles = index.profile_ids(options[category_column].to_numpy(), options[gender_column].to_numpy())
+    closing = index.closing_ranks(options[KEY_COLUMN], profiles)
+    ranks = pd.to_numeric(options[rank_column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    reachable = closing >= ranks
+
+    order = pd.to_numeric(options[order_column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    groups = options[group_column].to_numpy() if group_column else np.zeros(len(options))
+    # Order of each student's first option within reach
+    first_reachable = pd.Series(np.where(reachable, order, np.nan)).groupby(groups).transform("min").to_numpy()
+
+    return options.assign(**{
+        "Closing Rank": pd.array(closing, dtype="Int64"),
+        "Rank Margin": pd.array(closing - ranks, dtype="Int64"),
+        "No Closing Rank": np.isnan(closing),
+        "Out of Reach": closing < ranks,
+        "Dominated": order > first_reachable,
+    })
+
+
+def load_feasibility_index(master_file):
+    """The feasibility index of a master workbook, rebuilt only when its snapshot changes."""
+    parquet_path = ensure_snapshot(master_file)
+    stamp = os.stat(parquet_path).st_mtime
+    cached = _feasibility_cache.get(parquet_path)
+    if cached is None or cached[0] != stamp:
+        index = FeasibilityIndex(load_master(master_file, RANK_COLUMNS + [KEY_COLUMN]), load_master_index(master_file))
+        cached = (stamp, index)
+        _feasibility_cache[parquet_path] = cached
+    return cached[1]
@@ -0,0 +1,99 @@
+"""Memoized matplotlib charts for the thesis pages.
+
+Charts are drawn on standalone Figure objects rather than pyplot's global
+figure registry, rendered to PNG once and released, and cached by the plotted
+data and labels so reruns triggered by unrelated widgets reuse the image.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+
+# Rendered charts kept across reruns
+CACHE_SIZE = 256
+
+# Heatmaps wider than this many columns are drawn without cell annotations
+HEATMAP_ANNOTATE_MAX = 25
+# ... and wider than this without tick labels
+HEATMAP_LABEL_MAX = 80
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def frame_digest(df):
+    """Content hash of a DataFrame's values and column names."""
+    digest = hashlib.sha256(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def figure_png(fig, **savefig_kwargs):
+    """PNG bytes of fig; the figure is cleared afterwards so its artists are freed."""
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, format="png", **savefig_kwargs)
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+def cached_png(key, draw):
+    """PNG bytes from draw() (which returns a Figure), memoized by key."""
+    with _cache_lock:
+        png = _cache.get(key)
+        if png is not None:
+            _cache.move_to_end(key)
+            return png
+    png = figure_png(draw())
+    with _cache_lock:
+        _cache[key] = png
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return png
+
+
+def distribution_chart(distribution, column, title, x_label, y_label, legend_label, rotation=0):
+    """PNG bar chart of distribution's Count per value of column, memoized by data and labels."""
+    data = distribution[[column, "Count"]]
+
+    def draw():
+        # seaborn and matplotlib are imported on first draw; seaborn alone takes seconds to import
+        import seaborn as sns
+        from matplotlib.figure import Figure
+
+        fig = Figure()
+        ax = fig.subplots()
+        colors = sns.color_palette("Set2", len(data))
+        data.plot(kind="bar", x=column, y="Count", ax=ax, legend=False, color=colors)
+        ax.set_title(title)
+        ax.set_xlabel(x_label)
+        ax.set_ylabel(y_label)
+        ax.legend([legend_label])
+        ax.tick_params(axis="x", rotation=rotation)
+        return fig
+
+    key = ("distribution", frame_digest(data), column, title, x_label, y_label, legend_label, rotation)
+    return cached_png(key, draw)
+
+
+def correlation_heatmap(matrix, title="Correlation Heatmap"):
+    """PNG heatmap of a correlation matrix; annotations and labels are dropped for wide matrices."""
+    n = len(matrix.columns)
+
+    def draw():
+        import seaborn as sns
+        from matplotlib.figure import Figure
+
+        size = min(max(6.4, 0.3 * n), 24)
+        fig = Figure(figsize=(size, size * 0.8))
+        ax = fig.subplots()
+        labels = n <= HEATMAP_LABEL_MAX
+        sns.heatmap(matrix, annot=n <= HEATMAP_ANNOTATE_MAX, cmap="coolwarm", ax=ax,
+                    xticklabels=labels, yticklabels=labels)
+        ax.set_title(title)
+        return fig
+
+    return cached_png(("heatmap", frame_digest(matrix), title), draw)
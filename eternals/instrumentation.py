@@ -0,0 +1,241 @@
+"""Per-stage timing and peak-memory instrumentation for the pages.
+
+A page wraps its run in page_run() (or start_page_run()/end_page_run() for
+top-level scripts) and its stages in stage(). Each finished
+stage is appended to a JSON-lines log; the sidebar "Debug" expander can show
+the run's stages, trace peak memory with tracemalloc, or profile one run
+(pyinstrument when installed, cProfile otherwise).
+
+    with page_run("TS A R2 Verf"):
+        with stage("pdf_extraction"):
+            ...
+
+stage() is a no-op outside a page run.
+
+tracemalloc and the profilers are process-wide while Streamlit sessions are
+threads of one process, so they are shared under a lock: tracing stays on
+while any run traces and is stopped by the last one, and only one run is
+profiled at a time. Peaks measured while other sessions run include their
+allocations.
+"""
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+
+# JSON-lines log of every finished stage; empty disables it
+LOG_PATH = os.environ.get("ETERNALS_STAGE_LOG", os.path.join(".cache", "stages.jsonl"))
+
+_current_run = contextvars.ContextVar("eternals_page_run", default=None)
+
+# Guards tracemalloc and the profiler, which every session thread shares
+_lock = threading.Lock()
+_tracing = {"runs": 0, "owned": False}
+_profiling = {"run": None}
+
+
+def _append_log(record, path=None):
+    path = LOG_PATH if path is None else path
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except OSError:
+        # Instrumentation must never break the page
+        pass
+
+
+def _start_profiler():
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return "cProfile", profiler
+    profiler = Profiler()
+    profiler.start()
+    return "pyinstrument", profiler
+
+
+def _stop_profiler(kind, profiler):
+    """Text report of a profiler started by _start_profiler."""
+    if kind == "pyinstrument":
+        profiler.stop()
+        return profiler.output_text(unicode=True)
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+    return out.getvalue()
+
+
+class PageRun:
+    """Stage records of one script run of a page."""
+
+    def __init__(self, page, trace_memory=False, profile=False, log_path=None):
+        self.page = page
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+        self.profile_report = None
+        self.log_path = log_path
+        self.trace_memory = trace_memory
+        self.show_panel = False
+        self.token = None
+        self.profile_skipped = False
+        self._stack = []
+        self._start = time.perf_counter()
+        self._profiler = None
+        self._tracing = trace_memory
+        with _lock:
+            if trace_memory:
+                if _tracing["runs"] == 0:
+                    # Tracing someone else started is used but never stopped
+                    _tracing["owned"] = not tracemalloc.is_tracing()
+                    if _tracing["owned"]:
+                        tracemalloc.start()
+                _tracing["runs"] += 1
+            if profile:
+                if _profiling["run"] is None:
+                    _profiling["run"] = self.run_id
+                    self._profiler = _start_profiler()
+                else:
+                    self.profile_skipped = True
+
+    def _traced_memory(self, reset=False):
+        """(current, peak) traced memory, resetting the peak afterwards if asked."""
+        with _lock:
+            memory = tracemalloc.get_traced_memory()
+            if reset:
+                tracemalloc.reset_peak()
+        return memory
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block (and its peak traced memory) as stage name; nested stages get 'outer/inner'."""
+        if self.trace_memory:
+            # The parent's peak so far is kept before the counter is reset for this stage
+            current, peak = self._traced_memory(reset=True)
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+        else:
+            current = 0
+        frame = {"name": name, "start": time.perf_counter(), "base": current, "peak": 0}
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - frame["start"]
+            path = "/".join(entry["name"] for entry in self._stack)
+            self._stack.pop()
+            extra = {}
+            if self.trace_memory:
+                peak = max(frame["peak"], self._traced_memory()[1])
+                extra["peak_mb"] = round(max(peak - frame["base"], 0) / 2**20, 3)
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            self._record(path, seconds, **extra)
+
+    def _record(self, stage_path, seconds, **extra):
+        record = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "page": self.page,
+            "run": self.run_id,
+            "stage": stage_path,
+            "seconds": round(seconds, 6),
+            **extra,
+        }
+        self.records.append(record)
+        _append_log(record, self.log_path)
+
+    def finish(self):
+        """Record the run's total time and stop tracing and profiling started for it."""
+        self._record("total", time.perf_counter() - self._start)
+        with _lock:
+            if self._profiler is not None:
+                self.profile_report = _stop_profiler(*self._profiler)
+                self._profiler = None
+                _profiling["run"] = None
+            if self._tracing:
+                self._tracing = False
+                _tracing["runs"] -= 1
+                if _tracing["runs"] == 0 and _tracing["owned"]:
+                    tracemalloc.stop()
+                    _tracing["owned"] = False
+
+    def frame(self):
+        """The run's stage records as a DataFrame."""
+        return pd.DataFrame(self.records)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as a stage of the current page run (no-op outside one)."""
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    with run.stage(name):
+        yield
+
+
+def _debug_controls():
+    with st.sidebar.expander("Debug"):
+        show = st.checkbox("Show stage timings", key="debug_stage_timings")
+        trace = st.checkbox("Trace peak memory (slower)", key="debug_trace_memory")
+        # Clicking reruns the page, and that rerun is the one profiled
+        profile = st.button("Profile this page once", key="debug_profile")
+    return show, trace, profile
+
+
+def _show_panel(run):
+    with st.sidebar.expander("Stage timings", expanded=True):
+        if run.records:
+            frame = run.frame()
+            # Only traced stages have a peak; the total never does
+            st.dataframe(frame[[column for column in ["stage", "seconds", "peak_mb"] if column in frame]], hide_index=True)
+        else:
+            st.write("No stages recorded in this run.")
+        if run.profile_skipped:
+            st.write("Another session is being profiled; profile again when it finishes.")
+        if run.profile_report:
+            st.download_button("Download profile", run.profile_report, f"{run.page}-{run.run_id}-profile.txt")
+            st.code(run.profile_report[:20000])
+
+
+def start_page_run(page):
+    """Begin instrumenting one script run of page, reading the sidebar debug controls."""
+    show, trace, profile = _debug_controls()
+    run = PageRun(page, trace_memory=trace, profile=profile)
+    run.show_panel = show or profile
+    run.token = _current_run.set(run)
+    return run
+
+
+def end_page_run(run):
+    """Finish a run begun with start_page_run and show its panel if requested."""
+    _current_run.reset(run.token)
+    run.finish()
+    if run.show_panel:
+        _show_panel(run)
+
+
+@contextmanager
+def page_run(page):
+    """Instrument the enclosed script run of page, with the sidebar debug controls and panel."""
+    run = start_page_run(page)
+    try:
+        yield run
+    finally:
+        end_page_run(run)
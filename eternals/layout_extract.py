@@ -0,0 +1,237 @@
+"""Template extraction of fixed-layout tables from character positions.
+
+The option-entry PDFs all come from one government template: a ruled table
+with the same columns on every page and the header repeated at the top.
+Instead of running pdfplumber's table finder on every page, the column
+x-boundaries are calibrated once per document from the header row of the
+first page: its vertical rules, or else the positions of the header labels.
+Every character on a page is then bucketed into a column with one
+searchsorted call on its midpoint, as the table finder assigns characters to
+cells, and into a row by its line.
+
+Character positions come from pdfium (pypdfium2, installed with pdfplumber).
+Most of extract_table()'s time goes into pdfminer parsing the page, and
+pdfium's C parser reads these files many times faster. A calibration is
+accepted only if its first-page rows equal extract_table()'s. Pages that do
+not fit the template (wrapped cells, no header) are read with
+extract_table(). A document that cannot be calibrated returns None, and the
+caller uses the table finder throughout. Empty cells are None whichever way
+a page was read (extract_table() gives "" for them).
+"""
+import threading
+from io import BytesIO
+
+import numpy as np
+
+from eternals.pdf_extract import MIN_PAGES_FOR_POOL, WORKERS, map_page_chunks, split_page_range
+
+# Characters further apart than this (in points) start a new word, as with pdfplumber's x_tolerance
+X_TOLERANCE = 3
+# Text further below the last data row than this many row pitches is outside the table (a footer)
+FOOTER_GAP = 1.5
+# How far left of a header label its column starts when the header row has no vertical rules
+LABEL_MARGIN = 2.0
+
+# pdfium is not thread-safe, and Streamlit sessions share the process
+_pdfium_lock = threading.Lock()
+
+
+def _rows(table):
+    """Data rows of an extract_table() result, header dropped and empty cells as None."""
+    return [[cell or None for cell in row] for row in table[1:]] if table else []
+
+
+def page_chars(pdf_bytes, start, stop):
+    """Characters of pages [start, stop), one dict of arrays (x0, x1, top, bottom, text, spaced) per page.
+
+    Whitespace is dropped; spaced marks characters that followed whitespace
+    in the text stream, which is where words break.
+    """
+    import pypdfium2
+
+    pages = []
+    with _pdfium_lock:
+        pdf = pypdfium2.PdfDocument(pdf_bytes)
+        try:
+            for number in range(start, min(stop, len(pdf))):
+                page = pdf[number]
+                textpage = page.get_textpage()
+                n_chars = textpage.count_chars()
+                text = textpage.get_text_range(0, n_chars) if n_chars else ""
+                boxes = np.array([textpage.get_charbox(i) for i in range(n_chars)], dtype=np.float64).reshape(-1, 4)
+                height = page.get_height()
+                textpage.close()
+                page.close()
+                if len(text) != n_chars:
+                    # Characters outside the Basic Multilingual Plane break the index alignment
+                    pages.append(None)
+                    continue
+                blank = np.array([char.isspace() for char in text], dtype=bool)
+                spaced = np.concatenate([[True], blank[:-1]])[:n_chars]
+                keep = ~blank
+                pages.append({
+                    "x0": boxes[keep, 0], "x1": boxes[keep, 2],
+                    "top": height - boxes[keep, 3], "bottom": height - boxes[keep, 1],
+                    "text": np.array(list(text), dtype=object)[keep], "spaced": spaced[keep],
+                })
+        finally:
+            pdf.close()
+    return pages
+
+
+def _lines(chars):
+    """chars sorted top to bottom and left to right, with a line number and vertical centre for each."""
+    center = (chars["top"] + chars["bottom"]) / 2
+    order = np.argsort(center, kind="stable")
+    # A new line starts wherever the vertical centre jumps by more than half a text height
+    tolerance = max(float(np.median(chars["bottom"] - chars["top"])) / 2, 1.0)
+    line = np.empty(len(center), dtype=np.int64)
+    line[order] = np.concatenate([[0], np.cumsum(np.diff(center[order]) > tolerance)])
+    order = np.lexsort((chars["x0"], line))
+    return {**{key: values[order] for key, values in chars.items()}, "line": line[order], "center": center[order]}
+
+
+def _runs(*keys):
+    """Start and stop positions of the runs of equal consecutive values across the key arrays."""
+    change = np.zeros(len(keys[0]) - 1, dtype=bool)
+    for key in keys:
+        change |= key[1:] != key[:-1]
+    starts = np.concatenate([[0], np.flatnonzero(change) + 1])
+    return starts, np.concatenate([starts[1:], [len(keys[0])]])
+
+
+def calibrate(chars, columns, rules=()):
+    """Candidate column boundaries (outer edges included) from the header row of the first page.
+
+    The vertical rules crossing the header come first when there is one
+    between every pair of labels, then boundaries just left of each label,
+    then the midpoints of the gaps between labels. Returns an empty list when
+    no line spells out the header.
+    """
+    labels = [label.replace(" ", "").upper() for label in columns]
+    lines = _lines(chars)
+    header = next(((start, stop) for start, stop in zip(*_runs(lines["line"]))
+                   if "".join(lines["text"][start:stop]).upper() == "".join(labels)), None)
+    if header is None:
+        return []
+    # Label i covers the next len(label) characters of the header line
+    bounds = header[0] + np.cumsum([0] + [len(label) for label in labels])
+    starts = lines["x0"][bounds[:-1]]
+    ends = lines["x1"][bounds[1:] - 1]
+
+    candidates = []
+    rules = np.sort(np.asarray(rules, dtype=np.float64))
+    between = [rules[(rules >= end) & (rules <= start)] for end, start in zip(ends[:-1], starts[1:])]
+    outer_left, outer_right = rules[rules <= starts[0]], rules[rules >= ends[-1]]
+    if all(len(found) for found in between) and len(outer_left) and len(outer_right):
+        candidates.append(np.concatenate([[outer_left[-1]], [found[0] for found in between], [outer_right[0]]]))
+    candidates.append(np.concatenate([[-np.inf], starts[1:] - LABEL_MARGIN, [np.inf]]))
+    candidates.append(np.concatenate([[-np.inf], (ends[:-1] + starts[1:]) / 2, [np.inf]]))
+    return candidates
+
+
+def _cells(lines, boundaries):
+    """Cell text (None when empty) as an object array with one row per line and one per column, plus line centres."""
+    column = np.searchsorted(boundaries, (lines["x0"] + lines["x1"]) / 2, side="right") - 1
+    inside = (column >= 0) & (column < len(boundaries) - 1)
+    order = np.lexsort((lines["x0"][inside], column[inside], lines["line"][inside]))
+    line, column = lines["line"][inside][order], column[inside][order]
+    x0, x1 = lines["x0"][inside][order], lines["x1"][inside][order]
+    text, spaced = lines["text"][inside][order], lines["spaced"][inside][order]
+
+    # A space goes wherever the stream had whitespace or the characters are more than X_TOLERANCE apart
+    same_cell = np.concatenate([[False], (line[1:] == line[:-1]) & (column[1:] == column[:-1])])
+    gap = x0 - np.concatenate([[-np.inf], x1[:-1]])
+    glued = same_cell & (gap <= X_TOLERANCE) & ~spaced
+    pieces = np.where(glued, "", " ").astype(object) + text
+
+    line_ids, first = np.unique(line, return_index=True)
+    cells = np.full((len(line_ids), len(boundaries) - 1), None, dtype=object)
+    starts, stops = _runs(line, column) if len(line) else (np.array([], dtype=int), np.array([], dtype=int))
+    cells[np.searchsorted(line_ids, line[starts]), column[starts]] = [
+        "".join(pieces[start:stop]).strip() for start, stop in zip(starts, stops)
+    ]
+    return cells, lines["center"][inside][order][first]
+
+
+def page_rows(chars, boundaries, columns):
+    """Data rows of one page, or None when the page does not fit the template.
+
+    The page must have the header row followed by rows that each start with a
+    number; text further below the last row (a footer) is ignored.
+    """
+    if chars is None or not len(chars["text"]):
+        return None
+    cells, centers = _cells(_lines(chars), boundaries)
+    header = [label.upper() for label in columns]
+    is_header = [[(cell or "").upper() for cell in row] == header for row in cells]
+    if sum(is_header) != 1:
+        return None
+    header_at = is_header.index(True)
+    numbered = [cell is not None and cell.isdigit() for cell in cells[header_at + 1:, 0]]
+    # The table is the run of numbered rows right after the header
+    run = numbered.index(False) if False in numbered else len(numbered)
+    if run == 0:
+        return None
+    if run < len(numbered):
+        table_centers = centers[header_at:header_at + run + 2]
+        pitch = np.median(np.diff(table_centers[:-1]))
+        if table_centers[-1] - table_centers[-2] <= FOOTER_GAP * pitch:
+            # Text right under a row is a wrapped cell, which the table finder joins into the row
+            return None
+    return cells[header_at + 1:header_at + 1 + run].tolist()
+
+
+def _layout_range(pdf_bytes, boundaries, columns, start, stop):
+    """Data rows of pages [start, stop): from the template, or extract_table() for pages that do not fit it."""
+    results = []
+    plumber = None
+    try:
+        for number, chars in enumerate(page_chars(pdf_bytes, start, stop), start):
+            rows = page_rows(chars, boundaries, columns)
+            if rows is None:
+                if plumber is None:
+                    import pdfplumber
+
+                    plumber = pdfplumber.open(BytesIO(pdf_bytes))
+                rows = _rows(plumber.pages[number].extract_table())
+            results.append(rows)
+    finally:
+        if plumber is not None:
+            plumber.close()
+    return results
+
+
+def extract_layout_pages(pdf_bytes, columns, workers=None, min_pages=MIN_PAGES_FOR_POOL):
+    """Data rows (header dropped) of every page of a fixed-layout table, or None if it cannot be calibrated."""
+    import pdfplumber
+
+    with pdfplumber.open(BytesIO(pdf_bytes)) as plumber:
+        n_pages = len(plumber.pages)
+        if not n_pages:
+            return None
+        first_page = plumber.pages[0]
+        table = first_page.extract_table()
+        rules = [edge["x0"] for edge in first_page.vertical_edges]
+    if not table:
+        return None
+    first_chars = page_chars(pdf_bytes, 0, 1)[0]
+    if first_chars is None or not len(first_chars["text"]):
+        return None
+    # A calibration counts only if it reproduces the table finder's first page exactly
+    expected = _rows(table)
+    boundaries = next((candidate for candidate in calibrate(first_chars, columns, rules)
+                       if page_rows(first_chars, candidate, columns) == expected), None)
+    if boundaries is None:
+        return None
+
+    workers = WORKERS if workers is None else workers
+    pages = [expected]
+    if n_pages < 2:
+        return pages
+    if workers <= 1 or n_pages < max(min_pages, 2):
+        return pages + _layout_range(pdf_bytes, boundaries, columns, 1, n_pages)
+    # A couple of chunks per worker evens out pages that are slower to parse
+    ranges = split_page_range(n_pages - 1, workers * 2)
+    chunks = [(boundaries, columns, start + 1, stop + 1) for start, stop in ranges]
+    return pages + map_page_chunks(_layout_range, pdf_bytes, chunks, workers)
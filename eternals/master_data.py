@@ -0,0 +1,225 @@
+"""Columnar snapshots of the master choice workbooks.
+
+Parsing the xlsx with openpyxl is the slowest step of a page load, so each
+workbook is converted once into a typed Parquet snapshot and rebuilt only when
+the workbook's mtime and content hash change. Pages then memory-map the
+snapshot and read just the columns they need.
+
+The snapshot also carries the MAIN CODE (COLL_CRS) as a categorical column
+and a keyed index from each MAIN CODE to its row position.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_DIR = os.environ.get("ETERNALS_MASTER_SNAPSHOT_DIR", os.path.join(".cache", "master"))
+
+# Columns stored as numbers in the snapshot; everything else stays text
+NUMERIC_COLUMNS = [
+    "sno", "MyRank Order", "Fee", "overall_OPEN", "overall_BCA", "overall_BCB",
+    "overall_BCC", "overall_BCD", "overall_BCE", "overall_MSM", "overall_SC",
+    "overall_ST", "GEN_OPEN", "FEM_OPEN", "GEN_BCA", "FEM_BCA", "GEN_BCB",
+    "FEM_BCB", "GEN_BCC", "FEM_BCC", "GEN_BCD", "FEM_BCD", "GEN_BCE", "FEM_BCE",
+    "GEN_MSM", "FEM_MSM", "GEN_SC", "FEM_SC", "GEN_ST", "FEM_ST"
+]
+
+# Per-category closing-rank columns, which most views can skip
+RANK_COLUMNS = [column for column in NUMERIC_COLUMNS if column.split("_")[0] in ("overall", "GEN", "FEM")]
+
+KEY_COLUMN = "MAIN CODE"
+
+# Master workbook and order-range grouping used by each verification page
+PROFILES = {
+    "tsa-r2": ("tsar2choice.xlsx", ["Course Name", "Course Type", "Type"]),
+    "bcat-r1": ("tsbr1orderpg.xlsx", ["Course Name", "Course Type", "Fee Type"]),
+}
+
+# Bumped whenever the snapshot layout changes so stale snapshots are rebuilt
+SNAPSHOT_FORMAT = 2
+
+_build_lock = threading.Lock()
+_load_lock = threading.Lock()
+_index_cache = {}
+# Full snapshot frames shared by every session, keyed by snapshot path
+_master_cache = {}
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_paths(master_file):
+    """Return the (parquet, metadata) paths of the snapshot for a workbook."""
+    stem = os.path.splitext(os.path.basename(master_file))[0]
+    base = os.path.join(SNAPSHOT_DIR, stem)
+    return f"{base}.parquet", f"{base}.json"
+
+
+def index_path(master_file):
+    """Path of the MAIN CODE index stored next to the snapshot."""
+    return os.path.join(SNAPSHOT_DIR, f"{os.path.splitext(os.path.basename(master_file))[0]}.index.parquet")
+
+
+def build_main_code(coll, crs):
+    """MAIN CODE used to match options against the master: COLL and CRS joined by '_'."""
+    return coll.str.strip() + "_" + crs.str.strip()
+
+
+def read_workbook(master_file):
+    """Parse the workbook the way the pages always have: text, then numeric columns coerced."""
+    master_sheet = pd.read_excel(master_file, sheet_name=0, dtype=str)
+    for col in NUMERIC_COLUMNS:
+        if col in master_sheet.columns:
+            master_sheet[col] = pd.to_numeric(master_sheet[col], errors='coerce')
+    return master_sheet
+
+
+def _snapshot_is_current(master_file, parquet_path, meta_path):
+    if not (os.path.exists(parquet_path) and os.path.exists(meta_path)):
+        return False
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get("format") != SNAPSHOT_FORMAT:
+        return False
+    stat = os.stat(master_file)
+    if meta.get("mtime") == stat.st_mtime and meta.get("size") == stat.st_size:
+        return True
+    # Touched but unchanged workbooks (e.g. a fresh checkout) keep their snapshot
+    if meta.get("sha256") == _file_hash(master_file):
+        meta.update(mtime=stat.st_mtime, size=stat.st_size)
+        _write_meta(meta_path, meta)
+        return True
+    return False
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def build_snapshot(master_file):
+    """Convert the workbook into a Parquet snapshot and return its path."""
+    parquet_path, meta_path = snapshot_paths(master_file)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    stat = os.stat(master_file)
+    master_sheet = read_workbook(master_file)
+    if "COLL" in master_sheet.columns and "CRS" in master_sheet.columns:
+        _add_main_code_index(master_sheet, index_path(master_file))
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    master_sheet.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+    _write_meta(meta_path, {
+        "format": SNAPSHOT_FORMAT,
+        "source": os.path.abspath(master_file),
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "sha256": _file_hash(master_file),
+        "rows": len(master_sheet),
+    })
+    return parquet_path
+
+
+def _add_main_code_index(master_sheet, path):
+    """Add MAIN CODE as a categorical column and write the code -> first row position index."""
+    main_code = build_main_code(master_sheet["COLL"], master_sheet["CRS"])
+    codes, keys = pd.factorize(main_code, sort=True)
+    master_sheet[KEY_COLUMN] = pd.Categorical.from_codes(codes, categories=keys)
+    # np.unique returns the first row of every code; rows without COLL/CRS (code -1) are skipped
+    valid = codes >= 0
+    unique_codes, first_rows = np.unique(codes[valid], return_index=True)
+    positions = np.flatnonzero(valid)[first_rows]
+    index = pd.DataFrame({KEY_COLUMN: np.asarray(keys)[unique_codes], "position": positions.astype("int32")})
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    index.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def ensure_snapshot(master_file):
+    """Return the path of an up-to-date snapshot, rebuilding it if the workbook changed."""
+    parquet_path, meta_path = snapshot_paths(master_file)
+    with _build_lock:
+        if not _snapshot_is_current(master_file, parquet_path, meta_path):
+            build_snapshot(master_file)
+    return parquet_path
+
+
+def master_columns(master_file):
+    """Column names of the master sheet, read from the snapshot schema only."""
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(ensure_snapshot(master_file)).names
+
+
+def load_master(master_file, columns=None):
+    """The master sheet (optionally only some columns), read once per process from its snapshot.
+
+    Every session shares the cached frame's data; callers get their own frame
+    object but must not modify values in place.
+    """
+    parquet_path = ensure_snapshot(master_file)
+    stamp = os.stat(parquet_path).st_mtime
+    with _load_lock:
+        cached = _master_cache.get(parquet_path)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, pd.read_parquet(parquet_path, memory_map=True))
+            _master_cache[parquet_path] = cached
+    master_sheet = cached[1]
+    if columns is None:
+        return master_sheet.copy(deep=False)
+    return master_sheet[[col for col in columns if col in master_sheet.columns]]
+
+
+class MasterIndex:
+    """Hash index from MAIN CODE to the row position of that code in the master snapshot."""
+
+    def __init__(self, keys, positions):
+        self.keys = pd.Index(keys)
+        self.positions = np.asarray(positions, dtype=np.int64)
+
+    def key_ids(self, main_codes):
+        """Integer id of each MAIN CODE in the index, -1 where the code is not in the master."""
+        if isinstance(getattr(main_codes, "dtype", None), pd.CategoricalDtype):
+            # Probe each category once and broadcast through the codes
+            category_ids = self.keys.get_indexer(main_codes.cat.categories.astype(object))
+            codes = main_codes.cat.codes.to_numpy()
+            if not len(category_ids):
+                return np.full(len(codes), -1)
+            return np.where(codes >= 0, category_ids[codes], -1)
+        return self.keys.get_indexer(pd.Index(main_codes).astype(object))
+
+    def lookup(self, main_codes):
+        """Row positions for each MAIN CODE, -1 where the code is not in the master."""
+        ids = self.key_ids(main_codes)
+        if not len(self.positions):
+            return ids
+        return np.where(ids >= 0, self.positions[ids], -1)
+
+    def __contains__(self, main_code):
+        return main_code in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def load_master_index(master_file):
+    """Load the MAIN CODE index of a workbook, reusing it while the snapshot is unchanged."""
+    parquet_path = ensure_snapshot(master_file)
+    path = index_path(master_file)
+    stamp = os.stat(parquet_path).st_mtime
+    cached = _index_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    index_frame = pd.read_parquet(path)
+    index = MasterIndex(index_frame[KEY_COLUMN].to_numpy(), index_frame["position"].to_numpy())
+    _index_cache[path] = (stamp, index)
+    return index
@@ -0,0 +1,133 @@
+"""Delta between two master sheets (e.g. two counselling rounds), keyed by MAIN CODE.
+
+    python -m eternals.master_delta tsbr1orderpg.xlsx tsar2choice.xlsx --out delta.xlsx
+
+Options are aligned on MAIN CODE and the shared columns compared one column
+at a time over all common options, so only the options that actually differ
+are reported: added and removed options, changed columns, fee changes and
+closing-rank shifts. changed_keys is what batch re-verification uses to
+decide which students' lists need checking again.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from eternals.master_data import KEY_COLUMN, RANK_COLUMNS, build_main_code, load_master
+
+# Serial numbers follow the row position, so they are not compared as content
+POSITION_COLUMNS = ["sno"]
+FEE_COLUMN = "Fee"
+
+
+def _by_key(master_sheet):
+    """Master rows indexed by MAIN CODE, keeping the first row of each code (as the master index does)."""
+    if KEY_COLUMN in master_sheet.columns:
+        keys = master_sheet[KEY_COLUMN].astype(object)
+    else:
+        keys = build_main_code(master_sheet["COLL"].astype(str), master_sheet["CRS"].astype(str))
+    master_sheet = master_sheet.drop(columns=[KEY_COLUMN], errors="ignore").set_axis(pd.Index(keys.to_numpy(), name=KEY_COLUMN))
+    master_sheet = master_sheet[master_sheet.index.notna()]
+    return master_sheet[~master_sheet.index.duplicated()]
+
+
+def _column_differs(before, after):
+    """Cells of two aligned columns that differ; missing on both sides counts as equal."""
+    if pd.api.types.is_numeric_dtype(before) and pd.api.types.is_numeric_dtype(after):
+        a = before.to_numpy(dtype=np.float64, na_value=np.nan)
+        b = after.to_numpy(dtype=np.float64, na_value=np.nan)
+        return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+    a_missing, b_missing = before.isna().to_numpy(), after.isna().to_numpy()
+    same = before.astype(str).str.strip().to_numpy() == after.astype(str).str.strip().to_numpy()
+    return ~((same & ~a_missing & ~b_missing) | (a_missing & b_missing))
+
+
+class MasterDelta:
+    """Options added, removed and changed between an old and a new master sheet."""
+
+    def __init__(self, old, new, compare_columns=None):
+        old, new = _by_key(old), _by_key(new)
+        self.schema_changed = list(old.columns) != list(new.columns)
+        if compare_columns is None:
+            compare_columns = [column for column in old.columns if column in new.columns and column not in POSITION_COLUMNS]
+        self.compare_columns = list(compare_columns)
+        self.added = new.index.difference(old.index)
+        self.removed = old.index.difference(new.index)
+
+        common = old.index.intersection(new.index, sort=False)
+        before, after = old.loc[common, self.compare_columns], new.loc[common, self.compare_columns]
+        differs = np.column_stack([_column_differs(before[column], after[column]) for column in self.compare_columns]) \
+            if self.compare_columns else np.zeros((len(common), 0), dtype=bool)
+        rows = differs.any(axis=1)
+        names = np.array(self.compare_columns, dtype=object)
+        self.changed = pd.DataFrame({
+            KEY_COLUMN: common[rows],
+            "Changed Columns": [", ".join(names[row]) for row in differs[rows]],
+        })
+
+        changed_before, changed_after = before[rows], after[rows]
+        self.fee_changes = pd.DataFrame(columns=[KEY_COLUMN, "Old Fee", "New Fee", "Fee Change"])
+        if FEE_COLUMN in self.compare_columns:
+            fee_rows = differs[rows][:, self.compare_columns.index(FEE_COLUMN)]
+            old_fee = pd.to_numeric(changed_before[FEE_COLUMN][fee_rows], errors="coerce")
+            new_fee = pd.to_numeric(changed_after[FEE_COLUMN][fee_rows], errors="coerce")
+            self.fee_changes = pd.DataFrame({
+                KEY_COLUMN: old_fee.index, "Old Fee": old_fee.to_numpy(), "New Fee": new_fee.to_numpy(),
+                "Fee Change": (new_fee - old_fee).to_numpy(),
+            })
+
+        # One row per (option, rank column) that moved; 0 means no seat was allotted
+        rank_columns = [column for column in RANK_COLUMNS if column in self.compare_columns]
+        old_ranks = changed_before[rank_columns].stack().rename("Old Rank")
+        new_ranks = changed_after[rank_columns].stack().rename("New Rank")
+        shifts = pd.concat([old_ranks, new_ranks], axis=1)
+        shifts = shifts[(shifts["Old Rank"] != shifts["New Rank"]).to_numpy()]
+        self.rank_shifts = shifts.rename_axis([KEY_COLUMN, "Column"]).reset_index()
+        self.rank_shifts["Shift"] = self.rank_shifts["New Rank"] - self.rank_shifts["Old Rank"]
+
+    @property
+    def changed_keys(self):
+        """Every MAIN CODE whose master row was added, removed or changed."""
+        return self.added.append(self.removed).append(pd.Index(self.changed[KEY_COLUMN]))
+
+    def summary(self):
+        """Number of options of each kind of change."""
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "fee_changes": len(self.fee_changes),
+            "rank_shifts": int(self.rank_shifts[KEY_COLUMN].nunique()),
+            "schema_changed": self.schema_changed,
+        }
+
+    def edits(self):
+        """Added, removed and changed options in one table, sorted by MAIN CODE."""
+        edits = pd.concat([
+            pd.DataFrame({"Change": "added", KEY_COLUMN: self.added, "Changed Columns": ""}),
+            pd.DataFrame({"Change": "removed", KEY_COLUMN: self.removed, "Changed Columns": ""}),
+            self.changed.assign(Change="changed"),
+        ], ignore_index=True)[["Change", KEY_COLUMN, "Changed Columns"]]
+        return edits.sort_values(KEY_COLUMN, kind="stable").reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old_master", help="Master workbook of the earlier round")
+    parser.add_argument("new_master", help="Master workbook of the new round")
+    parser.add_argument("--out", default="master_delta.xlsx", help="Workbook to write the delta to")
+    args = parser.parse_args(argv)
+
+    delta = MasterDelta(load_master(args.old_master), load_master(args.new_master))
+    with pd.ExcelWriter(args.out) as writer:
+        pd.DataFrame([delta.summary()]).to_excel(writer, sheet_name="Summary", index=False)
+        delta.edits().to_excel(writer, sheet_name="Edits", index=False)
+        delta.fee_changes.to_excel(writer, sheet_name="Fee Changes", index=False)
+        delta.rank_shifts.to_excel(writer, sheet_name="Rank Shifts", index=False)
+    print(args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Key-aligned diff of two option lists (e.g. a student's order before and after an edit).
+
+Rows are matched on key columns (COLL + CRS by default) with a hash join
+instead of by position, so one inserted option does not shift every later
+row into a difference. Each matched pair is compared through a per-row
+content hash, and the result is a compact edit list of inserted, deleted,
+moved and changed options.
+"""
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["COLL", "CRS"]
+# Option numbers follow the row position, so they are not compared as content
+ORDER_COLUMN = "OPTNO"
+
+
+def unique_columns(columns):
+    """Column names with repeats renamed 'name.1', 'name.2', ... (as read_csv does)."""
+    seen = {}
+    names = []
+    for name in map(str, columns):
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(name if count == 0 else f"{name}.{count}")
+    return names
+
+
+def default_key_columns(columns):
+    """The standard key columns present in columns, matched ignoring case and surrounding spaces."""
+    normalized = {str(column).strip().upper(): column for column in columns}
+    return [normalized[key] for key in KEY_COLUMNS if key in normalized]
+
+
+def _keyed(df, key_columns, compare_columns):
+    """Per-row key hash, occurrence number of that key, and content hash."""
+    keys = pd.util.hash_pandas_object(df[key_columns].astype(str).apply(lambda column: column.str.strip()), index=False)
+    return pd.DataFrame({
+        "_key": keys.to_numpy(),
+        # Repeated keys are paired in order of appearance
+        "_occurrence": keys.groupby(keys.to_numpy()).cumcount().to_numpy(),
+        "_position": np.arange(1, len(df) + 1),
+        "_content": pd.util.hash_pandas_object(df[compare_columns].astype(str), index=False).to_numpy(),
+    })
+
+
+def _stable_positions(sequence):
+    """Boolean mask of a longest increasing subsequence of sequence (the rows that kept their relative order)."""
+    tails, tail_index, previous = [], [], np.full(len(sequence), -1)
+    for i, value in enumerate(sequence):
+        slot = bisect_left(tails, value)
+        if slot == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[slot] = value
+            tail_index[slot] = i
+        previous[i] = tail_index[slot - 1] if slot else -1
+    keep = np.zeros(len(sequence), dtype=bool)
+    i = tail_index[-1] if tail_index else -1
+    while i >= 0:
+        keep[i] = True
+        i = previous[i]
+    return keep
+
+
+def diff_orders(old, new, key_columns=None, compare_columns=None):
+    """Edit list turning old into new: one row per inserted, deleted, moved and/or changed option.
+
+    Positions are 1-based row numbers. An option is 'moved' when it is not
+    part of the longest run of common options that kept their relative order,
+    so an insertion or deletion alone does not mark later options as moved.
+    """
+    old = old.set_axis(unique_columns(old.columns), axis=1).reset_index(drop=True)
+    new = new.set_axis(unique_columns(new.columns), axis=1).reset_index(drop=True)
+    key_columns = list(key_columns or default_key_columns(old.columns))
+    missing = [column for column in key_columns if column not in old.columns or column not in new.columns]
+    if not key_columns or missing:
+        raise ValueError(f"Key columns must be present in both tables (missing: {', '.join(missing) or 'none chosen'})")
+    if compare_columns is None:
+        compare_columns = [column for column in old.columns
+                           if column in new.columns and column not in key_columns and column != ORDER_COLUMN]
+
+    pairs = _keyed(old, key_columns, compare_columns).merge(
+        _keyed(new, key_columns, compare_columns),
+        on=["_key", "_occurrence"], how="outer", suffixes=("_old", "_new"), indicator=True,
+    )
+    both = (pairs["_merge"] == "both").to_numpy()
+    changed = both & (pairs["_content_old"] != pairs["_content_new"]).to_numpy()
+
+    moved = np.zeros(len(pairs), dtype=bool)
+    common = pairs[both].sort_values("_position_old")
+    moved[pairs.index.get_indexer(common.index[~_stable_positions(common["_position_new"].astype(int).tolist())])] = True
+
+    edits = pairs[~both | changed | moved].copy()
+    edit_both = both[edits.index]
+    change = np.where(pairs["_merge"].loc[edits.index] == "left_only", "deleted", "inserted").astype(object)
+    change[edit_both & moved[edits.index] & changed[edits.index]] = "moved, changed"
+    change[edit_both & moved[edits.index] & ~changed[edits.index]] = "moved"
+    change[edit_both & ~moved[edits.index] & changed[edits.index]] = "changed"
+
+    old_position = edits["_position_old"].astype("Int64")
+    new_position = edits["_position_new"].astype("Int64")
+    # Key values come from whichever side has the row
+    has_old = old_position.notna().to_numpy()
+    key_values = pd.DataFrame(index=range(len(edits)), columns=key_columns, dtype=object)
+    key_values.iloc[has_old] = old.iloc[(old_position[has_old] - 1).to_numpy(dtype=int)][key_columns].to_numpy()
+    key_values.iloc[~has_old] = new.iloc[(new_position[~has_old] - 1).to_numpy(dtype=int)][key_columns].to_numpy()
+
+    changed_columns = np.full(len(edits), "", dtype=object)
+    content_changed = np.asarray(edit_both & changed[edits.index])
+    if content_changed.any() and compare_columns:
+        before = old.iloc[(old_position[content_changed] - 1).to_numpy(dtype=int)][compare_columns].astype(str).to_numpy()
+        after = new.iloc[(new_position[content_changed] - 1).to_numpy(dtype=int)][compare_columns].astype(str).to_numpy()
+        differs = before != after
+        names = np.array(compare_columns, dtype=object)
+        changed_columns[content_changed] = [", ".join(names[row]) for row in differs]
+
+    result = pd.concat([
+        pd.DataFrame({"Change": change}),
+        key_values,
+        pd.DataFrame({"Old Position": old_position.reset_index(drop=True), "New Position": new_position.reset_index(drop=True),
+                      "Changed Columns": changed_columns}),
+    ], axis=1)
+    # Edits in the order they appear in the new list; deletions next to where they were
+    order = new_position.fillna(old_position).to_numpy(dtype=float)
+    return result.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
+
+
+def diff_summary(edits):
+    """Number of edits of each kind."""
+    kinds = edits["Change"].str.split(", ").explode()
+    return {kind: int((kinds == kind).sum()) for kind in ["inserted", "deleted", "moved", "changed"]}
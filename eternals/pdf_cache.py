@@ -0,0 +1,163 @@
+"""Content-hash cache for parsed PDF extractions, shared by every page script.
+
+Results are keyed by the SHA-256 of the uploaded file plus the extractor name
+and its settings, kept in memory and on disk, and evicted least-recently-used
+once either store grows past its size limit.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.environ.get("ETERNALS_CACHE_DIR", os.path.join(".cache", "pdf"))
+MEMORY_LIMIT = int(os.environ.get("ETERNALS_PDF_CACHE_MEMORY_MB", "256")) * 1024 * 1024
+DISK_LIMIT = int(os.environ.get("ETERNALS_PDF_CACHE_DISK_MB", "2048")) * 1024 * 1024
+
+
+def file_bytes(source):
+    """Return the raw bytes of an upload, path or file object without moving its read position."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    position = source.tell()
+    source.seek(0)
+    data = source.read()
+    source.seek(position)
+    return data
+
+
+def content_hash(data):
+    """SHA-256 hex digest of the file contents."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(digest, extractor, settings=None):
+    """Combine the content hash with the extractor name and its settings."""
+    settings_json = json.dumps(settings or {}, sort_keys=True, default=str)
+    return hashlib.sha256(f"{extractor}\0{digest}\0{settings_json}".encode()).hexdigest()
+
+
+class ExtractionCache:
+    """Two-level (memory + disk) LRU cache of pickled extraction results."""
+
+    def __init__(self, directory=CACHE_DIR, memory_limit=MEMORY_LIMIT, disk_limit=DISK_LIMIT):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        # Entries are stored pickled so callers that mutate the returned
+        # DataFrame (e.g. rename(inplace=True)) never corrupt the cached copy.
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss."""
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+        if payload is None:
+            payload = self._read_disk(key)
+            if payload is None:
+                return None
+            self._remember(key, payload)
+        return pickle.loads(payload)
+
+    def put(self, key, result):
+        """Store a result in both cache levels."""
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, payload)
+        self._write_disk(key, payload)
+
+    def clear(self):
+        """Drop every entry from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".pkl"):
+                    os.remove(entry.path)
+
+    def _remember(self, key, payload):
+        if len(payload) > self.memory_limit:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_size -= len(previous)
+            self._memory[key] = payload
+            self._memory_size += len(payload)
+            while self._memory_size > self.memory_limit:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            os.utime(path)  # Mark as recently used for disk eviction
+            return payload
+        except OSError:
+            return None
+
+    def _write_disk(self, key, payload):
+        if self.disk_limit <= 0 or len(payload) > self.disk_limit:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError:
+            # The disk level is best effort; the memory level still holds the result
+            pass
+
+    def _evict_disk(self):
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".pkl")]
+        stats = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries]
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.disk_limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Process-wide cache shared by all sessions and pages."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ExtractionCache()
+    return _default_cache
+
+
+def cached_extraction(source, extractor, settings, compute, cache=None):
+    """Return compute(pdf_bytes), reusing a cached result for the same file and settings."""
+    cache = cache or default_cache()
+    data = file_bytes(source)
+    key = cache_key(content_hash(data), extractor, settings)
+    result = cache.get(key)
+    if result is None:
+        result = compute(data)
+        if result is not None:
+            cache.put(key, result)
+    return result
@@ -0,0 +1,109 @@
+"""Per-page PDF extraction spread across a process pool.
+
+pdfplumber is single-threaded and CPU bound, so long counselling PDFs are split
+into contiguous page ranges, each range is parsed in a worker process, and the
+per-page results are returned in page order.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+# Number of worker processes; 1 disables the pool entirely
+WORKERS = int(os.environ.get("ETERNALS_PDF_WORKERS", "0")) or (os.cpu_count() or 1)
+# Documents shorter than this are parsed in the calling process
+MIN_PAGES_FOR_POOL = int(os.environ.get("ETERNALS_PDF_MIN_POOL_PAGES", "8"))
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """Return the shared process pool, (re)creating it for a new worker count."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn keeps workers independent of the Streamlit server's threads
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+atexit.register(_reset_pool)
+
+
+def _extract_range(pdf_bytes, method, start, stop):
+    """Run page.<method>() on pages [start, stop) and return the results in order."""
+    import pdfplumber
+
+    results = []
+    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages[start:stop]:
+            results.append(getattr(page, method)())
+    return results
+
+
+def page_count(pdf_bytes):
+    """Number of pages in the PDF."""
+    import pdfplumber
+
+    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        return len(pdf.pages)
+
+
+def split_page_range(n_pages, n_chunks):
+    """Split range(n_pages) into at most n_chunks contiguous (start, stop) ranges."""
+    n_chunks = max(1, min(n_chunks, n_pages))
+    size, extra = divmod(n_pages, n_chunks)
+    ranges = []
+    start = 0
+    for i in range(n_chunks):
+        stop = start + size + (1 if i < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def map_page_chunks(func, pdf_bytes, chunks, workers):
+    """[func(pdf_bytes, *chunk) for chunk in chunks] flattened in order, one chunk per pool task."""
+    try:
+        pool = _get_pool(workers)
+        futures = [pool.submit(func, pdf_bytes, *chunk) for chunk in chunks]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+    except BrokenProcessPool:
+        # A crashed worker takes the pool down with it; finish in-process
+        _reset_pool()
+        results = []
+        for chunk in chunks:
+            results.extend(func(pdf_bytes, *chunk))
+        return results
+
+
+def extract_pages(pdf_bytes, method="extract_table", workers=None, min_pages=MIN_PAGES_FOR_POOL):
+    """Return [page.<method>() for page in pdf.pages], using a process pool for long files."""
+    workers = WORKERS if workers is None else workers
+    n_pages = page_count(pdf_bytes)
+    if workers <= 1 or n_pages < max(min_pages, 2):
+        return _extract_range(pdf_bytes, method, 0, n_pages)
+
+    # A couple of chunks per worker evens out pages that are slower to parse
+    ranges = split_page_range(n_pages, workers * 2)
+    return map_page_chunks(_extract_range, pdf_bytes, [(method, start, stop) for start, stop in ranges], workers)
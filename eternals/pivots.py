@@ -0,0 +1,65 @@
+"""Pivot tables for the thesis page.
+
+Filters are applied as one boolean mask before anything is grouped, group
+keys are categorical codes, and several aggregations are computed in a single
+grouped pass. Callers cache results by the full pivot definition (see
+filters_key), so rebuilding an earlier pivot does not rescan the data.
+"""
+import numpy as np
+import pandas as pd
+
+AGGREGATIONS = ["mean", "sum", "count", "max", "min"]
+
+
+def filters_key(filters):
+    """Hashable, order-independent form of a {column: [allowed values]} filter dict (empty lists are dropped)."""
+    return tuple(sorted((column, tuple(sorted(map(str, values)))) for column, values in (filters or {}).items() if values))
+
+
+def filter_mask(df, filters):
+    """Boolean mask of the rows whose value is among the allowed values of every filtered column."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, allowed in (filters or {}).items():
+        if len(allowed):
+            mask &= df[column].isin(allowed).to_numpy()
+    return mask
+
+
+def _group_key(series):
+    return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype("category")
+
+
+def pivot(df, rows, cols, values, aggfuncs, filters=None):
+    """Pivot of values by rows x cols; several aggregations add an outer column level named by aggregation.
+
+    Equivalent to pd.pivot_table(df[mask], index=rows, columns=cols,
+    values=values, aggfunc=aggfuncs) on the rows passing filters.
+    """
+    rows, cols, aggfuncs = list(rows), list(cols), list(aggfuncs)
+    keys = rows + cols
+    if not aggfuncs:
+        raise ValueError("Choose at least one aggregation")
+    if not keys:
+        raise ValueError("Choose at least one row or column to group by")
+    if values in keys:
+        raise ValueError(f"'{values}' cannot be both a grouping column and the values")
+    mask = filter_mask(df, filters)
+    frame = df.loc[mask, keys + [values]] if not mask.all() else df[keys + [values]]
+    frame = frame.assign(**{key: _group_key(frame[key]) for key in keys})
+
+    grouped = frame.groupby(keys, observed=True, sort=True)[values].agg(aggfuncs)
+    if cols:
+        grouped = grouped.unstack(cols)
+        if not rows:
+            # Every key was unstacked into a Series; keep it as one row, as pivot_table does
+            grouped = grouped.to_frame(values).T
+        # pivot_table drops combinations that never occur
+        grouped = grouped.dropna(axis=1, how="all")
+        if len(aggfuncs) == 1:
+            grouped = grouped.droplevel(0, axis=1)
+    elif len(aggfuncs) == 1:
+        grouped = grouped[aggfuncs[0]].to_frame(values)
+    else:
+        # pivot_table names each column (aggregation, values) when nothing is unstacked
+        grouped.columns = pd.MultiIndex.from_product([aggfuncs, [values]])
+    return grouped
@@ -0,0 +1,35 @@
+"""Warm-up of the master workbooks when the app starts.
+
+The first page load of a fresh server process would otherwise pay for
+building (or reading) the master snapshots. preload_masters() does that once
+per process on a background thread, filling the process-wide master and index
+caches that every session then shares.
+"""
+import threading
+
+from eternals.master_data import PROFILES, load_master, load_master_index
+
+MASTER_FILES = [master_file for master_file, _ in PROFILES.values()]
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def _warm(master_files):
+    for master_file in master_files:
+        try:
+            load_master(master_file)
+            load_master_index(master_file)
+        except Exception:
+            # The verification page reports a broken or missing workbook when it is opened
+            pass
+
+
+def preload_masters(master_files=None):
+    """Start the warm-up thread if this process has not started it yet; returns the thread."""
+    global _thread
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_warm, args=(master_files or MASTER_FILES,), name="master-preload", daemon=True)
+            _thread.start()
+        return _thread
@@ -0,0 +1,41 @@
+"""Vectorized compression of student order numbers into contiguous ranges.
+
+Orders are sorted once for all groups; run breaks are found with array diffs
+instead of a Python loop per group, and ranges are kept as structured
+(group..., start, end) rows until they are rendered.
+"""
+import numpy as np
+import pandas as pd
+
+
+def contiguous_ranges(df, group_cols, value_col):
+    """Return one (group..., start, end) row per run of consecutive integers in value_col."""
+    values = pd.to_numeric(df[value_col], errors="coerce")
+    frame = df[group_cols].assign(_value=values).dropna(subset=["_value"] + group_cols)
+    frame = frame.sort_values(group_cols + ["_value"], kind="stable")
+    if frame.empty:
+        return pd.DataFrame(columns=group_cols + ["start", "end"])
+
+    group_ids = frame.groupby(group_cols, sort=False).ngroup().to_numpy()
+    values = frame["_value"].to_numpy().astype(np.int64)
+    breaks = np.ones(len(values), dtype=bool)
+    breaks[1:] = (group_ids[1:] != group_ids[:-1]) | (values[1:] != values[:-1] + 1)
+
+    starts = np.flatnonzero(breaks)
+    ends = np.append(starts[1:], len(values)) - 1
+    ranges = frame.iloc[starts][group_cols].reset_index(drop=True)
+    ranges["start"] = values[starts]
+    ranges["end"] = values[ends]
+    return ranges
+
+
+def range_bounds(ranges, group_cols):
+    """First and last value covered by each group's ranges."""
+    return ranges.groupby(group_cols).agg(start=("start", "min"), end=("end", "max"))
+
+
+def format_ranges(ranges, group_cols):
+    """Render each group's ranges as '1-5, 8, 10-12', indexed by group."""
+    start = ranges["start"].astype(str)
+    labels = start.where(ranges["start"] == ranges["end"], start + "-" + ranges["end"].astype(str))
+    return labels.groupby([ranges[col] for col in group_cols], sort=False).agg(", ".join)
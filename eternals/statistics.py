@@ -0,0 +1,75 @@
+"""Column summaries, tests and correlations for the thesis statistics tabs.
+
+Per-column moments (count, mean, median, std, variance) are computed once for
+every numeric column in one vectorized pass. The t-test and one-way ANOVA are
+then evaluated from those summaries rather than the raw values, and
+correlations are computed only for the block of columns being shown.
+"""
+import numpy as np
+import pandas as pd
+
+
+def column_moments(numeric):
+    """Count, mean, median, std and variance (ddof=1) of every column, ignoring missing values."""
+    values = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=0)
+    filled = np.where(valid, values, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=0) / n
+        deviations = np.where(valid, values - mean, 0.0)
+        variance = (deviations ** 2).sum(axis=0) / (n - 1)
+        median = np.nanmedian(values, axis=0) if len(values) else np.full(values.shape[1], np.nan)
+    return pd.DataFrame({
+        "count": n,
+        "mean": mean,
+        "median": median,
+        "std": np.sqrt(variance),
+        "variance": variance,
+    }, index=numeric.columns)
+
+
+def ttest_from_moments(moments, col1, col2):
+    """Independent two-sample t-test (equal variances, as ttest_ind) of two columns; returns (t, p)."""
+    # scipy.stats is slow to import, so it is only loaded once a test is run
+    from scipy import stats
+
+    a, b = moments.loc[col1], moments.loc[col2]
+    result = stats.ttest_ind_from_stats(a["mean"], a["std"], a["count"], b["mean"], b["std"], b["count"])
+    return result.statistic, result.pvalue
+
+
+def anova_from_moments(moments, columns):
+    """One-way ANOVA across columns treated as groups (as f_oneway); returns (F, p)."""
+    from scipy import stats
+
+    groups = moments.loc[list(columns)]
+    n, mean, variance = groups["count"].to_numpy(), groups["mean"].to_numpy(), groups["variance"].to_numpy()
+    total = n.sum()
+    grand_mean = (n * mean).sum() / total
+    between = (n * (mean - grand_mean) ** 2).sum() / (len(groups) - 1)
+    within = ((n - 1) * variance).sum() / (total - len(groups))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f_stat = between / within
+    return f_stat, stats.f.sf(f_stat, len(groups) - 1, total - len(groups))
+
+
+def correlation_block(numeric, moments, columns):
+    """Pearson correlation matrix of columns.
+
+    Complete columns are standardized with the cached moments and correlated
+    with one matrix product; blocks with missing values fall back to pandas'
+    pairwise-complete correlation.
+    """
+    block = numeric[list(columns)]
+    values = block.to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isnan(values).any() or len(values) < 2:
+        return block.corr()
+    summary = moments.loc[list(columns)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        standardized = (values - summary["mean"].to_numpy()) / summary["std"].to_numpy()
+        matrix = standardized.T @ standardized / (len(values) - 1)
+    np.clip(matrix, -1.0, 1.0, out=matrix)
+    # Constant columns have no correlation, as in pandas
+    np.fill_diagonal(matrix, np.where(summary["std"].to_numpy() > 0, 1.0, np.nan))
+    return pd.DataFrame(matrix, index=block.columns, columns=block.columns)
@@ -0,0 +1,68 @@
+"""Stitching of per-page PDF tables into whole tables.
+
+Raw rows are buffered per header signature and each DataFrame is built once
+at the end, instead of concatenating onto an accumulated frame per page.
+Headers repeated at the top of later pages are recognised by their
+signature, and a page whose first table starts with a data row (a number in
+some cell) and is as wide as the running table is treated as its
+continuation. Tables with other headers are kept as separate tables rather
+than dropped.
+"""
+import re
+from collections import OrderedDict
+
+import pandas as pd
+
+_SPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"^-?\d+(?:[.,]\d+)*$")
+
+
+def header_signature(row):
+    """Row text normalized for header matching (case, spacing and line breaks ignored)."""
+    return tuple(_SPACE.sub(" ", str(cell or "")).strip().upper() for cell in row)
+
+
+def _looks_like_data(row):
+    """True if any cell is a number; header rows are all text."""
+    return any(_NUMBER.match(str(cell or "").strip()) for cell in row)
+
+
+def _continued_group(groups, current, width):
+    """Signature of the table a headerless page continues: the running table, else the latest one as wide."""
+    candidates = ([current] if current is not None else []) + list(reversed(groups))
+    return next((signature for signature in candidates if len(groups[signature][0]) == width), None)
+
+
+def _fit(row, width):
+    """Row padded with None or trimmed to width cells."""
+    row = list(row)
+    return row[:width] if len(row) >= width else row + [None] * (width - len(row))
+
+
+def stitch_tables(pages):
+    """DataFrames from per-page table lists ([[table rows, ...] per page]), in order of first appearance."""
+    groups = OrderedDict()  # header signature -> (header row, buffered data rows)
+    current = None
+    for page_tables in pages:
+        for position, table in enumerate(page_tables or []):
+            table = [row for row in table or [] if row and any(cell not in (None, "") for cell in row)]
+            if not table:
+                continue
+            signature = header_signature(table[0])
+            continued = None
+            if signature not in groups and position == 0 and _looks_like_data(table[0]):
+                continued = _continued_group(groups, current, len(table[0]))
+            if signature in groups:
+                # Same header as a table seen before (typically repeated on each page)
+                body = table[1:]
+            elif continued is not None:
+                # Headerless first table on a page, as wide as an earlier table: a continuation
+                signature, body = continued, table
+            else:
+                groups[signature] = (table[0], [])
+                body = table[1:]
+            header, rows = groups[signature]
+            # Header rows repeated inside the body are dropped
+            rows.extend(_fit(row, len(header)) for row in body if header_signature(row) != signature)
+            current = signature
+    return [pd.DataFrame(rows, columns=header) for header, rows in groups.values() if rows]
@@ -0,0 +1,64 @@
+"""Bulk categorical cell colouring for st.dataframe.
+
+Colours are looked up once per unique value through factorized codes and
+handed to the Styler as whole-column arrays, instead of one Python call per
+cell. Frames longer than STYLE_MAX_ROWS are paginated so only the visible
+slice is styled and sent to the browser.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Rows styled and rendered at once; longer frames are paginated
+STYLE_MAX_ROWS = int(os.environ.get("ETERNALS_STYLE_MAX_ROWS", "5000"))
+
+
+def _colormap(colormap):
+    """A listed colormap, given as the colormap or its matplotlib name (e.g. 'tab20')."""
+    if isinstance(colormap, str):
+        # matplotlib is only imported when a table is actually coloured
+        from matplotlib import colormaps
+        return colormaps[colormap]
+    return colormap
+
+
+def palette_styles(colormap, n_values, alpha=0.3):
+    """Background CSS for the first n_values colours of a listed colormap or colormap name ('' once the colours run out)."""
+    colormap = _colormap(colormap)
+    styles = [f"background-color: rgba({int(r*255)}, {int(g*255)}, {int(b*255)}, {alpha})"
+              for (r, g, b) in colormap.colors[:n_values]]
+    return styles + [""] * (n_values - len(styles))
+
+
+def column_styles(series, colormap, alpha=0.3):
+    """CSS string for every cell of series; values get colours in order of first appearance."""
+    codes, uniques = pd.factorize(series)
+    # The extra trailing slot is picked by code -1 (missing values), which stay uncoloured
+    palette = np.array(palette_styles(colormap, len(uniques), alpha) + [""], dtype=object)
+    return palette[codes]
+
+
+def paginate(n_rows, key, page_size=None):
+    """Show a page picker for long frames and return the (start, stop) row slice to render."""
+    page_size = page_size or STYLE_MAX_ROWS
+    if n_rows <= page_size:
+        return 0, n_rows
+    n_pages = -(-n_rows // page_size)
+    page = st.number_input(f"Page (of {n_pages}, {page_size:,} rows each)", min_value=1, max_value=n_pages, value=1, key=key)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n_rows)
+
+
+def show_colored_dataframe(df, column_colormaps, key, alpha=0.3, page_size=None):
+    """Render df with the given {column: colormap} colouring, paginating long frames."""
+    # Colours are assigned over the whole frame so they stay stable across pages
+    styles = {col: column_styles(df[col], colormap, alpha) for col, colormap in column_colormaps.items() if col in df.columns}
+    start, stop = paginate(len(df), key, page_size)
+    page = df.iloc[start:stop]
+    if not styles:
+        st.dataframe(page)
+        return
+    styled = page.style.apply(lambda column: styles[column.name][start:stop], axis=0, subset=list(styles))
+    st.dataframe(styled)
@@ -0,0 +1,132 @@
+"""Streaming extraction of college, course and student rows from TS allotment PDFs.
+
+Each stage is a generator (page -> lines -> parsed records -> DataFrame chunks),
+so peak memory depends on the chunk size rather than on the size of the
+statewide result book.
+"""
+from io import BytesIO
+
+import pandas as pd
+
+from eternals.tsexport_parser import LineParser, ParseStats
+
+STUDENT_COLUMNS = [
+    "College Code", "College Name", "Course Code", "Course Name",
+    "Rank", "Roll Number", "Percentile", "Candidate Name",
+    "Location", "Category", "Sex", "MIN", "PH", "Admission Details"
+]
+
+# Rows per DataFrame chunk in streaming mode
+CHUNK_SIZE = 50_000
+
+
+def iter_pdf_lines(pdf_bytes):
+    """Yield the text lines of every page, releasing each page as soon as it is read."""
+    import pdfplumber
+
+    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages:
+            extracted_text = page.extract_text()
+            # Older pdfplumber releases only offer flush_cache()
+            release = getattr(page, "close", None) or page.flush_cache
+            release()
+            if extracted_text:
+                yield from extracted_text.splitlines()
+
+
+def iter_student_records(lines, stats=None):
+    """Yield one STUDENT_COLUMNS row per student line, tracking the current college and course.
+
+    Lines that are not headers or student rows are counted in stats.
+    """
+    parser = LineParser(stats)
+    current_college_code = ""
+    current_college_name = ""
+    current_course_code = ""
+    current_course_name = ""
+
+    for line in lines:
+        line = line.strip()
+
+        # Skip empty or dashed lines
+        if not line or "-----" in line:
+            continue
+
+        # Capture college details from COLL ::
+        if line.startswith("COLL ::"):
+            parts = line.split(" - ")
+            current_college_code = parts[0].replace("COLL ::", "").strip()
+            current_college_name = parts[1].strip() if len(parts) > 1 else ""
+
+        # Capture course details from CRS ::
+        elif line.startswith("CRS ::"):
+            parts = line.split(" - ")
+            current_course_code = parts[0].replace("CRS ::", "").strip()
+            current_course_name = parts[1].strip() if len(parts) > 1 else ""
+
+        # Process student rows in a single pass
+        else:
+            student = parser.parse(line)
+            if student is not None:
+                yield [current_college_code, current_college_name,
+                       current_course_code, current_course_name] + student
+
+
+def iter_record_chunks(records, chunk_size=CHUNK_SIZE):
+    """Group records into DataFrames of at most chunk_size rows."""
+    buffer = []
+    for record in records:
+        buffer.append(record)
+        if len(buffer) >= chunk_size:
+            yield pd.DataFrame(buffer, columns=STUDENT_COLUMNS)
+            buffer = []
+    if buffer:
+        yield pd.DataFrame(buffer, columns=STUDENT_COLUMNS)
+
+
+def iter_student_chunks(pdf_bytes, chunk_size=CHUNK_SIZE, stats=None):
+    """Full streaming pipeline: PDF bytes -> DataFrame chunks."""
+    return iter_record_chunks(iter_student_records(iter_pdf_lines(pdf_bytes), stats), chunk_size)
+
+
+def extract_student_details(pdf_bytes):
+    """Extract every student row into a single DataFrame; returns (DataFrame, ParseStats)."""
+    stats = ParseStats()
+    chunks = list(iter_student_chunks(pdf_bytes, stats=stats))
+    if not chunks:
+        return pd.DataFrame(columns=STUDENT_COLUMNS), stats
+    return pd.concat(chunks, ignore_index=True), stats
+
+
+def write_excel_chunks(chunks, path, on_chunk=None):
+    """Stream chunks into a write-only xlsx workbook; returns the number of rows written."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(STUDENT_COLUMNS)
+    rows = 0
+    for chunk in chunks:
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append(row)
+        rows += len(chunk)
+        if on_chunk:
+            on_chunk(chunk, rows)
+    workbook.save(path)
+    return rows
+
+
+def write_parquet_chunks(chunks, path, on_chunk=None):
+    """Stream chunks into a Parquet file, one row group per chunk; returns the number of rows written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, pa.string()) for column in STUDENT_COLUMNS])
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+            if on_chunk:
+                on_chunk(chunk, rows)
+    return rows
@@ -0,0 +1,98 @@
+"""Single-pass parser for student rows in TS allotment result books.
+
+A row is printed left to right as
+
+    RANK  ROLL-NO  PERCENTILE  CANDIDATE NAME  OU  CAT  [SEX] [MSM] [PHO] [ADMISSION DETAILS]
+
+and is decoded with one precompiled, anchored pattern instead of a chain of
+searches and rfind slicing. Lines that do not match are counted per reason
+rather than printed.
+"""
+import re
+from collections import Counter
+
+CATEGORIES = ("BCA", "BCB", "BCC", "BCD", "BCE", "ST", "SC", "OC")
+
+ROW_PATTERN = re.compile(r"""
+    ^(?P<rank>\d{1,6})\s+
+    (?:\S+\s+)*?(?P<roll_no>24\d{9})\s+
+    (?:\S+\s+)*?(?P<percentile>\d+\.\d+)\s+
+    (?P<name>.*?)\s+
+    OU\s+
+    (?P<category>BCA|BCB|BCC|BCD|BCE|ST|SC|OC)\S*
+    (?:\s+(?P<sex>[FM]))?
+    (?:\s+(?P<min>MSM))?
+    (?:\s+(?P<ph>PHO))?
+    (?:\s+(?P<adm>N?S-.*-P[1-4]))?
+    \s*$
+""", re.VERBOSE)
+
+# Progressively longer prefixes of ROW_PATTERN, only tried on rejected lines to name the failing field
+_DIAGNOSTICS = [
+    ("missing rank", re.compile(r"^\d{1,6}\s")),
+    ("missing roll number", re.compile(r"^\d{1,6}\s+(?:\S+\s+)*?24\d{9}\s")),
+    ("missing percentile", re.compile(r"^\d{1,6}\s+(?:\S+\s+)*?24\d{9}\s+(?:\S+\s+)*?\d+\.\d+\s")),
+    ("missing location", re.compile(r"^\d{1,6}\s+(?:\S+\s+)*?24\d{9}\s+(?:\S+\s+)*?\d+\.\d+\s+.*?\sOU\s")),
+    ("missing category", re.compile(r"^\d{1,6}\s+(?:\S+\s+)*?24\d{9}\s+(?:\S+\s+)*?\d+\.\d+\s+.*?\sOU\s+(?:BCA|BCB|BCC|BCD|BCE|ST|SC|OC)")),
+]
+
+LOCATION = "OU"
+
+
+def parse_row(line):
+    """Return [rank, roll no, percentile, name, loc, cat, sex, min, ph, adm] for a student row, or None."""
+    match = ROW_PATTERN.match(line)
+    if match is None:
+        return None
+    rank, roll_no, percentile, name, category, sex, min_status, ph, adm = match.group(
+        "rank", "roll_no", "percentile", "name", "category", "sex", "min", "ph", "adm")
+    return [rank, roll_no, percentile, name, LOCATION, category,
+            sex or "", min_status or "", ph or "", adm or ""]
+
+
+def rejection_reason(line):
+    """Name the first field of ROW_PATTERN that a rejected line fails on."""
+    for reason, pattern in _DIAGNOSTICS:
+        if not pattern.match(line):
+            return reason
+    return "malformed trailing fields"
+
+
+class ParseStats:
+    """Counts of parsed and rejected lines, with a few sample lines per rejection reason."""
+
+    def __init__(self, max_samples=5):
+        self.parsed = 0
+        self.rejected = Counter()
+        self.samples = {}
+        self.max_samples = max_samples
+
+    def reject(self, line):
+        reason = rejection_reason(line)
+        self.rejected[reason] += 1
+        samples = self.samples.setdefault(reason, [])
+        if len(samples) < self.max_samples:
+            samples.append(line)
+
+    @property
+    def total_rejected(self):
+        return sum(self.rejected.values())
+
+    def summary(self):
+        """Rows of (reason, count, sample line) sorted by count."""
+        return [(reason, count, self.samples[reason][0]) for reason, count in self.rejected.most_common()]
+
+
+class LineParser:
+    """Parse student rows and record rejected lines in self.stats."""
+
+    def __init__(self, stats=None):
+        self.stats = stats if stats is not None else ParseStats()
+
+    def parse(self, line):
+        row = parse_row(line)
+        if row is None:
+            self.stats.reject(line)
+        else:
+            self.stats.parsed += 1
+        return row
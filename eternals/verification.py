@@ -0,0 +1,124 @@
+"""Verification of student option-entry PDFs against the master sheet.
+
+The join and the validation checks are computed once per upload from probes
+into the master MAIN CODE index and shared by every tab of the page. Nothing
+here depends on Streamlit, so the batch CLI runs the same steps.
+"""
+import numpy as np
+import pandas as pd
+
+from eternals.layout_extract import extract_layout_pages
+from eternals.master_data import KEY_COLUMN, build_main_code
+from eternals.pdf_cache import cached_extraction
+from eternals.pdf_extract import extract_pages
+from eternals.ranges import contiguous_ranges, format_ranges, range_bounds
+
+# Columns of the option-entry table in the uploaded PDF
+OPTION_COLUMNS = ["OPTNO", "COLL", "COLLEGE NAME", "PLACE", "DIST", "CRS", "FEE"]
+
+
+def extract_option_rows(pdf_bytes, workers=None, layout=True):
+    """Extract the option-entry table from every page of the PDF, or None if there is none.
+
+    The fixed-layout template path is tried first (layout=False skips it); a
+    document it cannot calibrate goes through pdfplumber's table finder.
+    """
+    data_rows = []
+    pages = extract_layout_pages(pdf_bytes, OPTION_COLUMNS, workers=workers) if layout else None
+    if pages is not None:
+        for rows in pages:
+            data_rows.extend(rows)
+    else:
+        # Pages are extracted in parallel and come back in page order
+        for table in extract_pages(pdf_bytes, "extract_table", workers=workers):
+            if table:
+                # Skip the header row and append the rest, with empty cells as None like the template path
+                data_rows.extend([cell or None for cell in row] for row in table[1:])
+
+    if data_rows:
+        return pd.DataFrame(data_rows, columns=OPTION_COLUMNS)
+    else:
+        return None
+
+
+def extract_option_data(source, workers=None):
+    """extract_option_rows() through the shared content-hash cache."""
+    return cached_extraction(source, "option_entry_table", {"columns": OPTION_COLUMNS, "empty_cells": None},
+                             lambda pdf_bytes: extract_option_rows(pdf_bytes, workers))
+
+
+class MasterMatch:
+    """Index-probe join of the uploaded options with the master, plus the validation sets."""
+
+    def __init__(self, pdf_data, master_sheet, index, suffixes=("_pdf", "_master")):
+        self.pdf_data = pdf_data
+        self.master_sheet = master_sheet
+        self.positions = index.lookup(pdf_data[KEY_COLUMN])
+        found = self.positions >= 0
+
+        # Master rows whose MAIN CODE appears in the upload, found through the key ids
+        matched_keys = np.zeros(len(index) + 1, dtype=bool)
+        matched_keys[index.key_ids(pdf_data[KEY_COLUMN])] = True
+        matched_keys[-1] = False  # Slot for codes missing from the index
+        master_matched = matched_keys[index.key_ids(master_sheet[KEY_COLUMN])]
+
+        self.merged = _join_positions(pdf_data, master_sheet, self.positions, suffixes)
+        self.missing_in_master = pdf_data[~found].reset_index(drop=True)
+        self.missing_in_upload = master_sheet[~master_matched].reset_index(drop=True)
+        self.duplicates = self.merged[pdf_data[KEY_COLUMN].duplicated(keep=False).to_numpy()]
+
+
+def _join_positions(pdf_data, master_sheet, positions, suffixes):
+    """Left join of pdf_data with the master rows at positions (-1 gives an empty row), like pd.merge."""
+    master_rows = master_sheet.drop(columns=[KEY_COLUMN])
+    # The master has a RangeIndex, so reindexing by position is a direct take with NaN rows for -1
+    master_rows = master_rows.reset_index(drop=True).reindex(positions).reset_index(drop=True)
+    left = pdf_data.reset_index(drop=True)
+    overlap = set(left.columns) & set(master_rows.columns)
+    left = left.rename(columns={col: f"{col}{suffixes[0]}" for col in overlap})
+    master_rows = master_rows.rename(columns={col: f"{col}{suffixes[1]}" for col in overlap})
+    return pd.concat([left, master_rows], axis=1)
+
+
+def prepare_upload(pdf_data):
+    """Rename the option-entry columns for consistency and add the MAIN CODE."""
+    pdf_data = pdf_data.rename(columns={
+        "OPTNO": "Order",
+        "COLL": "COLL",
+        "COLLEGE NAME": "College Name",
+        "PLACE": "Place",
+        "DIST": "District",
+        "CRS": "CRS_pdf",
+        "FEE": "Fee Type"
+    })
+    pdf_data[KEY_COLUMN] = build_main_code(pdf_data['COLL'], pdf_data['CRS_pdf'])
+    return pdf_data
+
+
+def build_order_ranges(merged_data, group_columns, order_column='Order'):
+    """Options filled and contiguous student order ranges per group, sorted by first order."""
+    order_ranges_table = merged_data.groupby(group_columns).agg(Options_Filled=(KEY_COLUMN, 'count'))
+
+    # Contiguous order ranges for every group in one sorted pass
+    ranges = contiguous_ranges(merged_data, group_columns, order_column)
+    bounds = range_bounds(ranges, group_columns)
+    order_ranges_table['Student_Order_Ranges'] = format_ranges(ranges, group_columns)
+    order_ranges_table['Student_Order_From'] = bounds['start'].astype('Int64')
+    order_ranges_table['Student_Order_To'] = bounds['end'].astype('Int64')
+    order_ranges_table['Student_Order_Ranges'] = order_ranges_table['Student_Order_Ranges'].fillna("")
+    order_ranges_table = order_ranges_table.reset_index()
+
+    # Sort by Student Order From, then the first group column
+    return order_ranges_table.sort_values(by=['Student_Order_From', group_columns[0]]).reset_index(drop=True)
+
+
+def validation_counts(match):
+    """Summary counts of the validation checks for one upload."""
+    return {
+        "options": len(match.pdf_data),
+        "matched": int((match.positions >= 0).sum()),
+        "missing_in_master": len(match.missing_in_master),
+        "missing_in_upload": len(match.missing_in_upload),
+        "duplicates": len(match.duplicates),
+        "missing_cells": int(match.merged.isnull().sum().sum()),
+    }
@@ -0,0 +1,97 @@
+"""Word (.docx) export of the thesis page's tables and charts.
+
+Table bodies are generated as one XML fragment from whole-column string
+arrays and appended in a single step, instead of python-docx's per-row
+add_row()/cells calls. Very long tables are capped, and reports can be built
+on a background thread so the page stays responsive.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+# Rows written per table; longer tables are truncated with a note
+MAX_TABLE_ROWS = int(os.environ.get("ETERNALS_DOCX_MAX_ROWS", "5000"))
+
+# Characters that are not allowed in XML text
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="word-report")
+
+
+def _cell_xml(text, width):
+    return (f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>'
+            f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p></w:tc>')
+
+
+def add_dataframe_table(doc, df, max_rows=None):
+    """Append df as a 'Table Grid' table (header row plus at most max_rows rows); returns the rows written."""
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls, qn
+
+    max_rows = MAX_TABLE_ROWS if max_rows is None else max_rows
+    body = df.iloc[:max_rows]
+    table_doc = doc.add_table(rows=1, cols=len(df.columns))
+    table_doc.style = 'Table Grid'
+    # Add headers
+    hdr_cells = table_doc.rows[0].cells
+    for i, col in enumerate(df.columns):
+        hdr_cells[i].text = str(col)
+    if body.empty:
+        return 0
+    # Add rows: every column is converted to text once, then all rows are parsed as one fragment
+    widths = [grid_col.get(qn("w:w")) for grid_col in table_doc._tbl.tblGrid]
+    columns = [
+        [escape(_INVALID_XML.sub("", text)) for text in body.iloc[:, i].map(str)]
+        for i in range(len(body.columns))
+    ]
+    rows = ("<w:tr>" + "".join(_cell_xml(text, width) for text, width in zip(row, widths)) + "</w:tr>"
+            for row in zip(*columns))
+    fragment = parse_xml(f"<w:tbl {nsdecls('w')}>{''.join(rows)}</w:tbl>")
+    table_doc._tbl.extend(list(fragment))
+    return len(body)
+
+
+def _chart_image(chart):
+    """Image stream for a chart entry given as 'image_buffer' (file-like), 'image' (PNG bytes) or 'render' (callable)."""
+    if "render" in chart:
+        return BytesIO(chart["render"]())
+    if "image" in chart:
+        return BytesIO(chart["image"])
+    stream = chart["image_buffer"]
+    stream.seek(0)
+    return stream
+
+
+def create_word_doc(content, max_rows=None):
+    """Build a Document from [{'title', 'tables': [{'title', 'dataframe'}], 'charts': [{'title', 'image_buffer'}]}]."""
+    # python-docx is only needed once a report is built
+    from docx import Document
+
+    doc = Document()
+    for section in content:
+        doc.add_heading(section['title'], level=1)
+        for table in section.get('tables', []):
+            doc.add_paragraph(f"Table: {table['title']}")
+            df = table['dataframe']
+            written = add_dataframe_table(doc, df, max_rows)
+            if written < len(df):
+                doc.add_paragraph(f"Showing the first {written:,} of {len(df):,} rows.")
+        for chart in section.get('charts', []):
+            doc.add_paragraph(f"Chart: {chart['title']}")
+            # Images are opened one at a time and released once embedded
+            doc.add_picture(_chart_image(chart))
+    return doc
+
+
+def word_doc_bytes(content, max_rows=None):
+    """The .docx file for content, as bytes."""
+    buffer = BytesIO()
+    create_word_doc(content, max_rows).save(buffer)
+    return buffer.getvalue()
+
+
+def start_word_doc(content, max_rows=None):
+    """Build the .docx for content on the background report thread; returns a Future of its bytes."""
+    return _executor.submit(word_doc_bytes, content, max_rows)
@@ -1,107 +1,80 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from scipy.stats import ttest_ind, f_oneway
-import matplotlib.pyplot as plt
-import seaborn as sns
-from io import BytesIO
-from docx import Document
-
-
-# Function to create a Word document
-def create_word_doc(content):
-    doc = Document()
-    for section in content:
-        doc.add_heading(section['title'], level=1)
-        for table in section.get('tables', []):
-            doc.add_paragraph(f"Table: {table['title']}")
-            df = table['dataframe']
-            table_doc = doc.add_table(rows=1, cols=len(df.columns))
-            table_doc.style = 'Table Grid'
-            # Add headers
-            hdr_cells = table_doc.rows[0].cells
-            for i, col in enumerate(df.columns):
-                hdr_cells[i].text = str(col)
-            # Add rows
-            for _, row in df.iterrows():
-                row_cells = table_doc.add_row().cells
-                for i, value in enumerate(row):
-                    row_cells[i].text = str(value)
-        for chart in section.get('charts', []):
-            doc.add_paragraph(f"Chart: {chart['title']}")
-            image_stream = chart["image_buffer"]
-            doc.add_picture(image_stream)
-    return doc
-
-
-# Helper function to apply manual ranges
-def apply_manual_ranges(value, ranges):
-    sorted_ranges = sorted(ranges, key=lambda x: float(x[1:]) if x[0] in "<>" else float(x.split("-")[0]))
-    for r in sorted_ranges:
-        if r.startswith("<"):
-            threshold = float(r[1:])
-            if value < threshold:
-                return r
-        elif r.startswith(">"):
-            threshold = float(r[1:])
-            if value > threshold:
-                return r
-        elif "-" in r:
-            low, high = map(float, r.split("-"))
-            if low <= value < high:
-                return r
-    return "Other"  # Catch-all for values outside specified ranges
+from eternals.binning import RangeSpec, binned_column
+from eternals.datasets import is_text_column, load_dataset
+from eternals.distributions import combined_frequencies, format_percentages, marginal_totals
+from eternals.figures import HEATMAP_ANNOTATE_MAX, correlation_heatmap, distribution_chart
+from eternals.instrumentation import page_run, stage
+from eternals.pivots import AGGREGATIONS, filters_key, pivot
+from eternals.statistics import anova_from_moments, ttest_from_moments
+from eternals.word_report import start_word_doc
+
+# Numeric columns correlated by default; wider sheets pick their own block
+CORRELATION_DEFAULT_COLUMNS = 30
 
 
 # Upload data with error handling for invalid files
 st.title("Eternals Thesis")
-uploaded_file = st.file_uploader("Upload your Excel file", type=["xlsx"])
-
-if uploaded_file:
-    try:
-        # Show progress bar while reading the file
-        with st.spinner("Reading Excel file..."):
-            df = pd.read_excel(uploaded_file)
-        st.success("File uploaded successfully!")
-    except Exception as e:
-        st.error(f"An error occurred while reading the file: {e}")
-        st.stop()
-
-    export_content = []
-
-    # Tab structure
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Distribution Tables", "Pivot Tables", "Statistical Analysis", "Correlations", "Graph Builder"])
-
-    # Tab 1: Distribution Tables
-    with tab1:
-        st.header("Automated Distribution Tables")
-        tab1_content = {"title": "Distribution Tables", "tables": [], "charts": []}
-
-        # Combined Distribution Table
-        combined_columns = st.multiselect("Select Columns for Combined Distribution", df.columns)
-        if combined_columns:
-            st.write(f"Combined Distribution for Columns: {', '.join(combined_columns)}")
-            combined_distribution = df[combined_columns].apply(lambda row: tuple(row), axis=1).value_counts().reset_index()
-            combined_distribution.columns = ["Combination", "Count"]
-            combined_distribution["Percentage"] = (combined_distribution["Count"] / combined_distribution["Count"].sum() * 100).round(2).astype(str) + "%"
-            combined_distribution.reset_index(drop=True, inplace=True)
-            combined_distribution.index = combined_distribution.index + 1  # Start index from 1
-
-            # Convert all columns to strings
-            combined_distribution = combined_distribution.astype(str)
-
-            st.dataframe(combined_distribution)
-            tab1_content["tables"].append({"title": "Combined Distribution", "dataframe": combined_distribution})
-
-        # Individual Column Distribution
-        for column in df.columns:
-            if df[column].dtype in [np.int64, np.float64, object]:
+with page_run("Thesis Calculations"):
+    uploaded_file = st.file_uploader("Upload your Excel file", type=["xlsx"])
+
+    if uploaded_file:
+        try:
+            # Show progress bar while reading the file; reruns and other sessions reuse the parsed workbook
+            with st.spinner("Reading Excel file..."), stage("read_excel"):
+                dataset = load_dataset(uploaded_file, session_state=st.session_state)
+                df = dataset.frame
+            st.success("File uploaded successfully!")
+        except Exception as e:
+            st.error(f"An error occurred while reading the file: {e}")
+            st.stop()
+
+        numeric_columns = list(dataset.numeric().columns)
+        export_content = []
+
+        # Tab structure
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(["Distribution Tables", "Pivot Tables", "Statistical Analysis", "Correlations", "Graph Builder"])
+
+        # Tab 1: Distribution Tables
+        with tab1, stage("tab.distribution_tables"):
+            st.header("Automated Distribution Tables")
+            tab1_content = {"title": "Distribution Tables", "tables": [], "charts": []}
+
+            # Combined Distribution Table
+            combined_columns = st.multiselect("Select Columns for Combined Distribution", df.columns)
+            if combined_columns:
+                st.write(f"Combined Distribution for Columns: {', '.join(combined_columns)}")
+                # Grouped counts over the selected columns, one column per selected field
+                combined_distribution = format_percentages(combined_frequencies(df, combined_columns))
+                combined_distribution.index = combined_distribution.index + 1  # Start index from 1
+
+                st.dataframe(combined_distribution)
+                tab1_content["tables"].append({"title": "Combined Distribution", "dataframe": combined_distribution})
+
+                if st.checkbox("Show marginal totals", key="combined_marginal_totals"):
+                    totals = format_percentages(marginal_totals(df, combined_columns))
+                    totals.index = totals.index + 1  # Start index from 1
+                    st.dataframe(totals)
+                    tab1_content["tables"].append({"title": "Combined Distribution Marginal Totals", "dataframe": totals})
+
+            # Individual Column Distribution
+            # Numeric and text columns (text may be stored as categoricals)
+            distribution_columns = [column for column in df.columns
+                                    if column in numeric_columns or is_text_column(df[column])]
+            # Only the chosen columns are rendered (and exported), so wide questionnaires stay responsive
+            if st.checkbox("Show distributions for all columns", value=False, key="all_distributions"):
+                shown_columns = distribution_columns
+            else:
+                shown_columns = st.multiselect("Columns to show distributions for", distribution_columns, key="distribution_columns")
+                st.caption("Only the columns shown here are included in the Word export.")
+
+            for column in shown_columns:
                 st.subheader(f"Distribution for {column}")
 
                 # Option to use manual ranges or automatic binning
                 use_manual_ranges = st.checkbox(f"Use Manual Ranges for {column}?", key=f"{column}_manual_ranges")
                 manual_ranges = []
-                if use_manual_ranges and df[column].dtype in [np.int64, np.float64]:
+                if use_manual_ranges and column in numeric_columns:
                     st.write("Specify manual ranges (e.g., '<5', '5-10', '>90')")
                     manual_ranges = st.text_area(
                         f"Enter ranges for {column} (one range per line)", 
@@ -109,24 +82,33 @@ if uploaded_file:
                         key=f"{column}_manual_range_input"
                     ).splitlines()
 
+                # Binning goes into a separate series; df keeps the raw values for the other tabs
+                values = df[column]
+
                 # Use automatic binning if manual ranges are not specified
                 if not use_manual_ranges or not manual_ranges:
                     use_ranges = st.checkbox(f"Use Dynamic Ranges for {column}?", key=f"{column}_ranges")
-                    if use_ranges and df[column].dtype in [np.int64, np.float64]:
+                    if use_ranges and column in numeric_columns:
+                        is_float = pd.api.types.is_float_dtype(df[column])
                         range_step = st.number_input(
                             f"Step size for {column} ranges",
-                            min_value=0.01 if df[column].dtype == np.float64 else 1,
-                            value=10 if df[column].dtype == np.int64 else 0.1,
+                            min_value=0.01 if is_float else 1,
+                            value=0.1 if is_float else 10,
                             key=f"{column}_range_step",
                         )
-                        bins = np.arange(df[column].min(), df[column].max() + range_step, range_step)
-                        labels = [f"{round(bins[i], 2)}-{round(bins[i + 1], 2)}" for i in range(len(bins) - 1)]
-                        df[column] = pd.cut(df[column], bins=bins, labels=labels, right=False)
+                        spec = RangeSpec.from_step(df[column].min(), df[column].max(), range_step)
+                        # Values outside the steps are left out, as with pd.cut
+                        values = dataset.artifact(("binned", column, spec.key, None),
+                                                  lambda: binned_column(df[column], spec, other_label=None))
                 elif use_manual_ranges:
-                    df[column] = df[column].apply(lambda x: apply_manual_ranges(x, manual_ranges))
+                    try:
+                        spec = RangeSpec.parse(manual_ranges)
+                        values = dataset.artifact(("binned", column, spec.key), lambda: binned_column(df[column], spec))
+                    except ValueError as e:
+                        st.error(f"Invalid ranges for {column}: {e}")
 
                 # Create distribution table
-                distribution = df[column].value_counts().reset_index()
+                distribution = values.value_counts().reset_index()
                 distribution.columns = [column, "Count"]
                 distribution["Percentage"] = (distribution["Count"] / distribution["Count"].sum() * 100).round(2).astype(str) + '%'
                 distribution.reset_index(drop=True, inplace=True)
@@ -151,144 +133,146 @@ if uploaded_file:
                         key=f"{column}_orientation"
                     )
 
-                    # Plot chart with color differentiation
-                    fig, ax = plt.subplots()
-                    colors = sns.color_palette("Set2", len(distribution.iloc[:-1]))
-                    distribution.iloc[:-1].plot(kind="bar", x=column, y="Count", ax=ax, legend=False, color=colors)
-                    ax.set_title(graph_title)
-                    ax.set_xlabel(x_label)
-                    ax.set_ylabel(y_label)
-                    ax.legend([legend_label])
+                    # Chart is memoized by the plotted counts and labels; the figure is closed once rendered
                     rotation_angle = 0 if x_axis_orientation == "Horizontal" else 90
-                    ax.tick_params(axis="x", rotation=rotation_angle)
-                    st.pyplot(fig)
+                    chart_png = distribution_chart(distribution.iloc[:-1], column, graph_title, x_label, y_label, legend_label, rotation_angle)
+                    st.image(chart_png)
 
                     # Save chart for Word export
-                    buffer = BytesIO()
-                    fig.savefig(buffer, format="png")
-                    buffer.seek(0)
-                    tab1_content["charts"].append({"title": f"{column} Distribution", "image_buffer": buffer})
+                    tab1_content["charts"].append({"title": f"{column} Distribution", "image": chart_png})
                 else:
                     st.info(f"No data available for column {column}.")
 
-        export_content.append(tab1_content)
-
-    # Tab 2: Pivot Tables
-    with tab2:
-        st.header("Pivot Tables")
-        st.write("Select columns to create pivot tables.")
-        rows = st.multiselect("Rows", df.columns)
-        cols = st.multiselect("Columns", df.columns)
-        values = st.selectbox("Values", df.columns)
-        agg_func = st.selectbox("Aggregation Function", ["mean", "sum", "count", "max", "min"])
-        filters = st.multiselect("Filters", df.columns)
-
-        if st.button("Generate Pivot Table"):
-            try:
-                pivot_table = pd.pivot_table(df, index=rows, columns=cols, values=values, aggfunc=agg_func)
-                pivot_table.reset_index(drop=True, inplace=True)
-                pivot_table.index = pivot_table.index + 1  # Start index from 1
-                st.dataframe(pivot_table)
-            except Exception as e:
-                st.error(f"Error generating pivot table: {e}")
-
-    # Tab 3: Statistical Analysis
-    with tab3:
-        st.header("Statistical Analysis")
-        st.write("Select columns for statistical calculations.")
-        selected_columns = st.multiselect("Select Columns", df.select_dtypes(include=[np.number]).columns)
-        
-        # T-Test
-        if len(selected_columns) == 2:
-            col1, col2 = selected_columns[:2]
-            st.write(f"Calculating statistics between {col1} and {col2}")
-
-            stats = {
-                "Metric": ["Mean", "Median", "Std Dev", "T-Statistic", "P-Value"],
-                col1: [
-                    df[col1].mean(),
-                    df[col1].median(),
-                    df[col1].std(),
-                    None,  # Placeholder for T-Statistic
-                    None,  # Placeholder for P-Value,
-                ],
-                col2: [
-                    df[col2].mean(),
-                    df[col2].median(),
-                    df[col2].std(),
-                    None,
-                    None,
-                ],
-            }
-            t_stat, p_value = ttest_ind(df[col1].dropna(), df[col2].dropna())
-            stats[col1][3] = t_stat
-            stats[col1][4] = p_value
-            stats[col2][3] = t_stat
-            stats[col2][4] = p_value
-
-            stats_df = pd.DataFrame(stats)
-            stats_df.index = stats_df.index + 1  # Start index from 1
-            st.dataframe(stats_df)
-
-        # ANOVA
-        if len(selected_columns) > 2:
-            st.write("Performing ANOVA test for selected columns.")
-            groups = [df[col].dropna() for col in selected_columns]
-            f_stat, p_value = f_oneway(*groups)
-            st.write(f"ANOVA F-Statistic: {f_stat:.4f}")
-            st.write(f"ANOVA P-Value: {p_value:.4f}")
-
-    # Tab 4: Correlations
-    with tab4:
-        st.header("Correlations")
-        st.write("Correlation matrix of numeric columns.")
-        numeric_df = df.select_dtypes(include=[np.number])
-        if numeric_df.empty:
-            st.warning("No numeric columns available for correlation.")
-        else:
-            correlation_matrix = numeric_df.corr()
-            correlation_matrix.reset_index(drop=True, inplace=True)
-            correlation_matrix.index = correlation_matrix.index + 1  # Start index from 1
-            st.dataframe(correlation_matrix)
-
-            fig, ax = plt.subplots()
-            sns.heatmap(correlation_matrix, annot=True, cmap="coolwarm", ax=ax)
-            ax.set_title("Correlation Heatmap")
-            st.pyplot(fig)
-
-    # Tab 5: Graph Builder
-    with tab5:
-        st.header("Graph Builder")
-        st.write("Select columns to build graphs.")
-        x_col = st.selectbox("X-Axis", df.columns)
-        y_col = st.selectbox("Y-Axis", df.columns)
-        graph_type = st.selectbox("Graph Type", ["Scatter", "Line", "Bar", "Histogram", "Boxplot"])
-
-        graph_title = st.text_input("Graph Title", value=f"{x_col} vs {y_col}")
-        x_label = st.text_input("X-Axis Label", value=x_col)
-        y_label = st.text_input("Y-Axis Label", value=y_col)
-
-        if st.button("Generate Graph"):
-            fig, ax = plt.subplots()
-            if graph_type == "Scatter":
-                sns.scatterplot(x=df[x_col], y=df[y_col], ax=ax)
-            elif graph_type == "Line":
-                sns.lineplot(x=df[x_col], y=df[y_col], ax=ax)
-            elif graph_type == "Bar":
-                sns.barplot(x=df[x_col], y=df[y_col], ax=ax)
-            elif graph_type == "Histogram":
-                sns.histplot(df[x_col], bins=30, kde=True, ax=ax)
-            elif graph_type == "Boxplot":
-                sns.boxplot(x=df[x_col], y=df[y_col], ax=ax)
-            ax.set_title(graph_title)
-            ax.set_xlabel(x_label)
-            ax.set_ylabel(y_label)
-            st.pyplot(fig)
-
-    # Download Button
-    if st.button("Download as Word Document"):
-        doc = create_word_doc(export_content)
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        st.download_button("Download Word Document", buffer, "data_analysis.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+            export_content.append(tab1_content)
+
+        # Tab 2: Pivot Tables
+        with tab2, stage("tab.pivot_tables"):
+            st.header("Pivot Tables")
+            st.write("Select columns to create pivot tables.")
+            rows = st.multiselect("Rows", df.columns)
+            cols = st.multiselect("Columns", df.columns)
+            values = st.selectbox("Values", df.columns)
+            agg_funcs = st.multiselect("Aggregation Functions", AGGREGATIONS, default=["mean"])
+            filters = st.multiselect("Filters", df.columns)
+
+            # Rows are narrowed to the chosen values of each filter column before grouping
+            filter_values = {}
+            for column in filters:
+                options = dataset.artifact(("unique_values", column), lambda: sorted(df[column].dropna().unique().tolist(), key=str))
+                filter_values[column] = st.multiselect(f"Keep {column} values (empty keeps all)", options, key=f"{column}_pivot_filter")
+
+            if st.button("Generate Pivot Table"):
+                try:
+                    # Results are cached per pivot definition, so rebuilding a previous pivot skips the data
+                    pivot_key = ("pivot", filters_key(filter_values), tuple(rows), tuple(cols), values, tuple(agg_funcs))
+                    pivot_table = dataset.artifact(pivot_key, lambda: pivot(df, rows, cols, values, agg_funcs, filter_values))
+                    pivot_table = pivot_table.reset_index()
+                    pivot_table.index = pivot_table.index + 1  # Start index from 1
+                    st.dataframe(pivot_table)
+                except Exception as e:
+                    st.error(f"Error generating pivot table: {e}")
+
+        # Tab 3: Statistical Analysis
+        with tab3, stage("tab.statistical_analysis"):
+            st.header("Statistical Analysis")
+            st.write("Select columns for statistical calculations.")
+            selected_columns = st.multiselect("Select Columns", numeric_columns)
+
+            # Tests use the per-column summaries computed once for the whole sheet
+            moments = dataset.moments()
+
+            # T-Test
+            if len(selected_columns) == 2:
+                col1, col2 = selected_columns[:2]
+                st.write(f"Calculating statistics between {col1} and {col2}")
+
+                t_stat, p_value = ttest_from_moments(moments, col1, col2)
+                stats = {"Metric": ["Mean", "Median", "Std Dev", "T-Statistic", "P-Value"]}
+                for col in (col1, col2):
+                    stats[col] = [moments.at[col, "mean"], moments.at[col, "median"], moments.at[col, "std"], t_stat, p_value]
+
+                stats_df = pd.DataFrame(stats)
+                stats_df.index = stats_df.index + 1  # Start index from 1
+                st.dataframe(stats_df)
+
+            # ANOVA
+            if len(selected_columns) > 2:
+                st.write("Performing ANOVA test for selected columns.")
+                f_stat, p_value = anova_from_moments(moments, selected_columns)
+                st.write(f"ANOVA F-Statistic: {f_stat:.4f}")
+                st.write(f"ANOVA P-Value: {p_value:.4f}")
+
+        # Tab 4: Correlations
+        with tab4, stage("tab.correlations"):
+            st.header("Correlations")
+            st.write("Correlation matrix of numeric columns.")
+            if not numeric_columns:
+                st.warning("No numeric columns available for correlation.")
+            else:
+                # Only the chosen block of columns is correlated and drawn
+                correlation_columns = st.multiselect(
+                    "Columns to correlate", numeric_columns, default=numeric_columns[:CORRELATION_DEFAULT_COLUMNS], key="correlation_columns"
+                )
+                if len(correlation_columns) < 2:
+                    st.info("Select at least two columns.")
+                else:
+                    correlation_matrix = dataset.correlation(correlation_columns)
+                    st.image(correlation_heatmap(correlation_matrix))
+                    if len(correlation_columns) > HEATMAP_ANNOTATE_MAX:
+                        st.caption("Values are not annotated on heatmaps this wide; see the table below.")
+
+                    correlation_table = correlation_matrix.reset_index(drop=True)
+                    correlation_table.index = correlation_table.index + 1  # Start index from 1
+                    st.dataframe(correlation_table)
+
+        # Tab 5: Graph Builder
+        with tab5, stage("tab.graph_builder"):
+            st.header("Graph Builder")
+            st.write("Select columns to build graphs.")
+            x_col = st.selectbox("X-Axis", df.columns)
+            y_col = st.selectbox("Y-Axis", df.columns)
+            graph_type = st.selectbox("Graph Type", ["Scatter", "Line", "Bar", "Histogram", "Boxplot"])
+
+            graph_title = st.text_input("Graph Title", value=f"{x_col} vs {y_col}")
+            x_label = st.text_input("X-Axis Label", value=x_col)
+            y_label = st.text_input("Y-Axis Label", value=y_col)
+
+            if st.button("Generate Graph"):
+                # Plotting libraries are imported only when a graph is requested
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+
+                fig, ax = plt.subplots()
+                if graph_type == "Scatter":
+                    sns.scatterplot(x=df[x_col], y=df[y_col], ax=ax)
+                elif graph_type == "Line":
+                    sns.lineplot(x=df[x_col], y=df[y_col], ax=ax)
+                elif graph_type == "Bar":
+                    sns.barplot(x=df[x_col], y=df[y_col], ax=ax)
+                elif graph_type == "Histogram":
+                    sns.histplot(df[x_col], bins=30, kde=True, ax=ax)
+                elif graph_type == "Boxplot":
+                    sns.boxplot(x=df[x_col], y=df[y_col], ax=ax)
+                ax.set_title(graph_title)
+                ax.set_xlabel(x_label)
+                ax.set_ylabel(y_label)
+                st.pyplot(fig)
+                plt.close(fig)
+
+        # Download Button: the report is built on a background thread so the page stays usable meanwhile
+        if st.button("Download as Word Document"):
+            with stage("word_export.submit"):
+                st.session_state["word_report"] = (dataset.key, start_word_doc(export_content))
+        # A report built for a previously uploaded workbook is dropped
+        report_key, report = st.session_state.get("word_report", (None, None))
+        if report is not None and report_key != dataset.key:
+            del st.session_state["word_report"]
+            report = None
+        if report is not None:
+            if not report.done():
+                st.info("Building the Word document in the background...")
+                st.button("Check report status")
+            elif report.exception() is not None:
+                st.error(f"Error building the Word document: {report.exception()}")
+            else:
+                st.download_button("Download Word Document", report.result(), "data_analysis.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
@@ -1,23 +1,18 @@
 import streamlit as st
 import pandas as pd
-import camelot
+from eternals.camelot_extract import PageRangeError, cached_stream_tables
 
-def extract_pdf_data(uploaded_pdf):
+def extract_pdf_data(uploaded_pdf, page_range=""):
     """Extract tabular data from the uploaded PDF file using Camelot."""
     try:
-        # Save the uploaded file to a temporary location
-        with open("temp.pdf", "wb") as f:
-            f.write(uploaded_pdf.read())
-        
-        # Extract tables using Camelot
-        tables = camelot.read_pdf("temp.pdf", pages="all", flavor="stream")
+        # Each request parses from its own temporary copy; results are cached by content and page range
+        tables = cached_stream_tables(uploaded_pdf, page_range)
         
         if len(tables) == 0:
             return None
         
         # Concatenate all extracted tables into a single DataFrame
-        data_frames = [table.df for table in tables]
-        combined_df = pd.concat(data_frames, ignore_index=True)
+        combined_df = pd.concat(tables, ignore_index=True)
         
         # Rename columns based on your PDF's structure
         if len(combined_df.columns) >= 6:
@@ -28,6 +23,9 @@ def extract_pdf_data(uploaded_pdf):
         else:
             st.warning("Extracted table has fewer columns than expected.")
             return combined_df
+    except PageRangeError as e:
+        st.error(f"Invalid page range: {e}")
+        return None
     except Exception as e:
         st.error(f"An error occurred while extracting tables: {e}")
         return None
@@ -61,11 +59,12 @@ def main():
     st.write("Upload a PDF file to extract tabular data.")
     
     uploaded_pdf = st.file_uploader("Upload PDF File", type=["pdf"])
+    page_range = st.text_input("Pages to extract (e.g. 1-5, 8, 10-end; blank for all)", value="")
     
     if uploaded_pdf:
         try:
             # Extract data from the PDF
-            extracted_data = extract_pdf_data(uploaded_pdf)
+            extracted_data = extract_pdf_data(uploaded_pdf, page_range)
             
             # Display the extracted data
             display_data_table(extracted_data)
@@ -5,6 +5,8 @@ from scipy.stats import ttest_ind, f_oneway
 import matplotlib.pyplot as plt
 import seaborn as sns
 from io import BytesIO
+from eternals.datasets import is_text_column, load_dataset
+from eternals.distributions import combined_frequencies, format_percentages, marginal_totals
 from docx import Document
 
 
@@ -58,7 +60,9 @@ st.title("Eternals Thesis")
 uploaded_file = st.file_uploader("Upload your Excel file", type=["xlsx"])
 
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
+    # The parsed workbook is shared across reruns; this page bins columns in place, so it works on a copy
+    df = load_dataset(uploaded_file, session_state=st.session_state).frame.copy()
+    numeric_columns = list(df.select_dtypes(include=[np.number]).columns)
     export_content = []
 
     # Tab structure
@@ -73,27 +77,28 @@ if uploaded_file:
         combined_columns = st.multiselect("Select Columns for Combined Distribution", df.columns)
         if combined_columns:
             st.write(f"Combined Distribution for Columns: {', '.join(combined_columns)}")
-            combined_distribution = df[combined_columns].apply(lambda row: tuple(row), axis=1).value_counts().reset_index()
-            combined_distribution.columns = ["Combination", "Count"]
-            combined_distribution["Percentage"] = (combined_distribution["Count"] / combined_distribution["Count"].sum() * 100).round(2).astype(str) + "%"
-            combined_distribution.reset_index(drop=True, inplace=True)
+            # Grouped counts over the selected columns, one column per selected field
+            combined_distribution = format_percentages(combined_frequencies(df, combined_columns))
             combined_distribution.index = combined_distribution.index + 1  # Start index from 1
 
-            # Convert all columns to strings
-            combined_distribution = combined_distribution.astype(str)
-
             st.dataframe(combined_distribution)
             tab1_content["tables"].append({"title": "Combined Distribution", "dataframe": combined_distribution})
 
+            if st.checkbox("Show marginal totals", key="combined_marginal_totals"):
+                totals = format_percentages(marginal_totals(df, combined_columns))
+                totals.index = totals.index + 1  # Start index from 1
+                st.dataframe(totals)
+                tab1_content["tables"].append({"title": "Combined Distribution Marginal Totals", "dataframe": totals})
+
         # Individual Column Distribution
         for column in df.columns:
-            if df[column].dtype in [np.int64, np.float64, object]:
+            if column in numeric_columns or is_text_column(df[column]):
                 st.subheader(f"Distribution for {column}")
 
                 # Option to use manual ranges or automatic binning
                 use_manual_ranges = st.checkbox(f"Use Manual Ranges for {column}?", key=f"{column}_manual_ranges")
                 manual_ranges = []
-                if use_manual_ranges and df[column].dtype in [np.int64, np.float64]:
+                if use_manual_ranges and column in numeric_columns:
                     st.write("Specify manual ranges (e.g., '<5', '5-10', '>90')")
                     manual_ranges = st.text_area(
                         f"Enter ranges for {column} (one range per line)", 
@@ -104,14 +109,15 @@ if uploaded_file:
                 # Use automatic binning if manual ranges are not specified
                 if not use_manual_ranges or not manual_ranges:
                     use_ranges = st.checkbox(f"Use Dynamic Ranges for {column}?", key=f"{column}_ranges")
-                    if use_ranges and df[column].dtype in [np.int64, np.float64]:
+                    if use_ranges and column in numeric_columns:
+                        is_float = pd.api.types.is_float_dtype(df[column])
                         range_step = st.number_input(
                             f"Step size for {column} ranges",
-                            min_value=0.01 if df[column].dtype == np.float64 else 1,
-                            value=10 if df[column].dtype == np.int64 else 0.1,
+                            min_value=0.01 if is_float else 1,
+                            value=0.1 if is_float else 10,
                             key=f"{column}_range_step",
                         )
-                        bins = np.arange(df[column].min(), df[column].max() + range_step, range_step)
+                        bins = np.arange(df[column].min().item(), df[column].max().item() + range_step, range_step)
                         labels = [f"{round(bins[i], 2)}-{round(bins[i + 1], 2)}" for i in range(len(bins) - 1)]
                         df[column] = pd.cut(df[column], bins=bins, labels=labels, right=False)
                 elif use_manual_ranges:
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from eternals.pivots import pivot
+
+DATA = pd.DataFrame({
+    "Category": ["OPEN", "OPEN", "BCA", "BCA", "SC"],
+    "Gender": ["M", "F", "M", "F", "M"],
+    "Rank": [120.0, 340.0, 560.0, 780.0, 910.0],
+})
+
+
+@pytest.mark.parametrize("rows, cols", [(["Category"], []), (["Category"], ["Gender"]), ([], ["Gender"])])
+@pytest.mark.parametrize("aggfuncs", [["sum"], ["sum", "count"]])
+def test_matches_pivot_table(rows, cols, aggfuncs):
+    expected = pd.pivot_table(DATA, index=rows or None, columns=cols or None, values="Rank",
+                              aggfunc=aggfuncs if len(aggfuncs) > 1 else aggfuncs[0])
+    result = pivot(DATA, rows, cols, "Rank", aggfuncs)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_index_type=False,
+                                  check_column_type=False, check_categorical=False)
+
+
+def test_filters_are_applied_before_grouping():
+    result = pivot(DATA, ["Category"], [], "Rank", ["sum", "count"], {"Gender": ["M"]})
+    assert list(result.columns) == [("sum", "Rank"), ("count", "Rank")]
+    assert result.loc["OPEN", ("sum", "Rank")] == 120.0
+    assert result.loc["BCA", ("count", "Rank")] == 1
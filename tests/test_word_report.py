@@ -0,0 +1,13 @@
+import numpy as np
+import pandas as pd
+from docx import Document
+
+from eternals.word_report import add_dataframe_table
+
+
+def test_missing_values_are_written_as_text():
+    doc = Document()
+    df = pd.DataFrame({"MAIN CODE": ["JNTH_CSE", np.nan], "Order": [1.0, np.nan]})
+    assert add_dataframe_table(doc, df) == 2
+    rows = [[cell.text for cell in row.cells] for row in doc.tables[0].rows]
+    assert rows == [["MAIN CODE", "Order"], ["JNTH_CSE", "1.0"], ["nan", "nan"]]